@@ -0,0 +1,8 @@
+"""
+UHAI DAMU - development and legacy servers
+Run them from the project root as modules, so the shared root modules
+(page_builder, metrics, structured_log) import without path changes:
+
+    python -m Backend.app_simple
+    python -m Backend.chatbot_api
+"""
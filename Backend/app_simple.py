@@ -1,16 +1,17 @@
 """
 UHAI DAMU - Simple Flask App (Test Version)
+Run from the project root: python -m Backend.app_simple
 """
 
-from flask import Flask, send_from_directory, jsonify
+from flask import Flask, jsonify
 import os
 from datetime import datetime
 
-# Create Flask app
-app = Flask(__name__, static_folder='../', static_url_path='')
+from Backend.dev_pages import send_page
 
-# Base directory
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Create Flask app
+# Files are served by serve_index/serve_file below, so pages get their partials
+app = Flask(__name__, static_folder=None)
 
 # ============================================
 # SERVE HTML FILES
@@ -18,14 +19,14 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 @app.route('/')
 def serve_index():
-    return send_from_directory(BASE_DIR, 'index.html')
+    return send_page('index.html')
 
 @app.route('/<path:filename>')
 def serve_file(filename):
     if '..' in filename or filename.startswith('/'):
         return "Invalid path", 400
     try:
-        return send_from_directory(BASE_DIR, filename)
+        return send_page(filename)
     except Exception as e:
         return f"File not found: {filename}", 404
 
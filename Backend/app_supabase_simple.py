@@ -1,9 +1,10 @@
 """
 UHAI DAMU - Supabase Backend (Using HTTP Requests)
 No extra packages needed - just Flask and requests
+Run from the project root: python -m Backend.app_supabase_simple
 """
 
-from flask import Flask, send_from_directory, jsonify, request, session
+from flask import Flask, jsonify, request, session
 from flask_cors import CORS
 import os
 import bcrypt
@@ -11,14 +12,14 @@ import requests
 from datetime import datetime
 import re
 
+from Backend.dev_pages import send_page
+
 # Create Flask app
-app = Flask(__name__, static_folder='../', static_url_path='')
+# Files are served by serve_index/serve_file below, so pages get their partials
+app = Flask(__name__, static_folder=None)
 app.secret_key = 'uhai-damu-secret-key-2025'
 CORS(app, supports_credentials=True, origins=['http://localhost:5001', 'http://127.0.0.1:5001'])
 
-# Base directory
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
 # ============================================
 # SUPABASE CONFIGURATION 
 # ============================================
@@ -58,13 +59,13 @@ def supabase_request(method, endpoint, data=None):
 
 @app.route('/')
 def serve_index():
-    return send_from_directory(BASE_DIR, 'index.html')
+    return send_page('index.html')
 
 @app.route('/<path:filename>')
 def serve_file(filename):
     if '..' in filename or filename.startswith('/'):
         return "Invalid path", 400
-    return send_from_directory(BASE_DIR, filename)
+    return send_page(filename)
 
 # ============================================
 # API ENDPOINTS
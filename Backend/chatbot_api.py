@@ -1,20 +1,32 @@
 """
 UHAI DAMU - Google Gemini Chatbot API
 With your personal Gemini API key
+Run from the project root: python -m Backend.chatbot_api
 """
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import google.generativeai as genai
 import os
+import time
 from datetime import datetime
 
+import metrics
+import structured_log
+
 # ============================================
 # CREATE FLASK APP
 # ============================================
 app = Flask(__name__)
 CORS(app)  # This allows your website to talk to the API
 
+structured_log.setup_logging()
+log = structured_log.get_logger('chatbot')
+
+@app.before_request
+def assign_request_id():
+    structured_log.request_id_var.set(structured_log.request_id_from(request.headers.get('X-Request-ID')))
+
 # ============================================
 # YOUR GEMINI API KEY
 # ============================================
@@ -213,6 +225,17 @@ def test():
         'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     })
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint (Gemini latency and fallbacks)"""
+    if not metrics.scrape_allowed(request.remote_addr, request.headers.get('Authorization')):
+        return jsonify({'success': False, 'error': 'Endpoint not found'}), 404
+    if not metrics.METRICS_ENABLED:
+        return jsonify({'success': False, 'error': 'prometheus_client is not installed'}), 503
+    
+    body, content_type = metrics.render()
+    return body, 200, {'Content-Type': content_type}
+
 @app.route('/api/chatbot/ask', methods=['POST'])
 def ask_chatbot():
     """Main endpoint - ask any question"""
@@ -227,19 +250,22 @@ def ask_chatbot():
                 'error': 'Please ask a question'
             }), 400
         
-        print(f"\n🤔 User asked: {user_message[:50]}...")
+        log.debug('User asked: %s', user_message[:50])
         
         # Try Gemini AI first
+        started = time.perf_counter()
         try:
             response = call_gemini(user_message)
-            print(f"✅ Gemini responded")
+            metrics.GEMINI_LATENCY.labels('ok').observe(time.perf_counter() - started)
             return jsonify({
                 'success': True,
                 'response': response,
                 'source': 'gemini_ai'
             })
         except Exception as e:
-            print(f"⚠️ Gemini error: {e}")
+            metrics.GEMINI_LATENCY.labels('error').observe(time.perf_counter() - started)
+            metrics.GEMINI_FALLBACKS.labels(type(e).__name__).inc()
+            log.warning('Gemini error, using knowledge base: %s', e)
             # Fall back to knowledge base
             response = get_knowledge_base_response(user_message)
             return jsonify({
@@ -249,7 +275,7 @@ def ask_chatbot():
             })
             
     except Exception as e:
-        print(f"❌ Error: {e}")
+        log.exception('Chatbot error: %s', e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -0,0 +1,25 @@
+"""
+UHAI DAMU - page serving for the Backend/ dev servers
+Source pages hold <!-- include: nav.html --> comments; the dev servers send
+them through page_builder so the navigation and footer are filled in.
+"""
+
+import os
+
+from flask import current_app, send_from_directory
+
+import page_builder
+
+# Project root, where the pages and partials/ live
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def send_page(filename):
+    """Send a file from the project root; .html pages get their partials"""
+    if not filename.endswith('.html'):
+        return send_from_directory(PROJECT_ROOT, filename)
+    try:
+        html, _ = page_builder.assemble(os.path.join(PROJECT_ROOT, filename), PROJECT_ROOT)
+    except (OSError, UnicodeDecodeError):
+        return send_from_directory(PROJECT_ROOT, filename)
+    return current_app.response_class(html, mimetype='text/html')
@@ -1,15 +1,19 @@
 """
 UHAI DAMU - Working Test Server
 Serves all HTML files
+Run from the project root: python -m Backend.test_server
 """
 
-from flask import Flask, send_from_directory, jsonify
+from flask import Flask, jsonify
 from flask_cors import CORS
 import os
 from datetime import datetime
 
+from Backend.dev_pages import send_page
+
 # Create Flask app
-app = Flask(__name__, static_folder='../', static_url_path='')
+# Files are served by serve_index/serve_file below, so pages get their partials
+app = Flask(__name__, static_folder=None)
 CORS(app)
 
 # ============================================
@@ -19,7 +23,7 @@ CORS(app)
 @app.route('/')
 def serve_index():
     """Serve the main index.html"""
-    return send_from_directory('..', 'index.html')
+    return send_page('index.html')
 
 @app.route('/<path:filename>')
 def serve_file(filename):
@@ -27,7 +31,7 @@ def serve_file(filename):
     # Prevent directory traversal attacks
     if '..' in filename or filename.startswith('/'):
         return "Invalid path", 400
-    return send_from_directory('..', filename)
+    return send_page(filename)
 
 # ============================================
 # API ENDPOINTS
@@ -0,0 +1,11 @@
+-- UHAI DAMU - optional constituency column for hospitals (Supabase)
+-- Hospitals are filtered by county through their user row
+-- (users.county). The Supabase hospitals table has no constituency column,
+-- so GET /api/blood-stock/<county>/<constituency> returns the whole county
+-- unless this column exists and app.py runs with
+-- BLOOD_STOCK_BY_CONSTITUENCY=1. Run it once in the Supabase SQL editor,
+-- fill in the values, then set the variable.
+
+ALTER TABLE public.hospitals ADD COLUMN IF NOT EXISTS constituency TEXT;
+
+CREATE INDEX IF NOT EXISTS hospitals_constituency_idx ON public.hospitals (constituency);
@@ -0,0 +1,33 @@
+-- UHAI DAMU - Supabase (PostgreSQL) helper functions
+-- Run once in the Supabase SQL editor. app.py falls back to slower
+-- client-side queries when a function is missing.
+
+-- Admin dashboard: total units and number of critical stock rows,
+-- aggregated in the database instead of downloading blood_stock.
+CREATE OR REPLACE FUNCTION public.blood_stock_summary(critical_threshold INTEGER DEFAULT 3)
+RETURNS TABLE (total_units BIGINT, critical_stock BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        COALESCE(SUM(units_available), 0)::BIGINT,
+        COUNT(*) FILTER (WHERE COALESCE(units_available, 0) <= critical_threshold)::BIGINT
+    FROM public.blood_stock;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.blood_stock_summary(INTEGER) TO anon, authenticated;
+
+-- Public hospitals list: a fingerprint of the verified hospitals. app.py
+-- polls this and refetches the list only when it changes (a hospital is
+-- added, verified, unverified or renamed).
+CREATE OR REPLACE FUNCTION public.verified_hospitals_version()
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT md5(COALESCE(string_agg(id::TEXT || ':' || COALESCE(hospital_name, ''), ',' ORDER BY id::TEXT), ''))
+    FROM public.hospitals
+    WHERE is_verified;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.verified_hospitals_version() TO anon, authenticated;
@@ -0,0 +1,260 @@
+"""
+UHAI DAMU - ASGI entry point
+Serves the hot public read endpoints as coroutines on one event loop and
+hands every other route to the Flask app.
+
+Run with:
+    uvicorn asgi:application --host 0.0.0.0 --port 5001
+    gunicorn asgi:application -k uvicorn.workers.UvicornWorker
+
+Native routes (GET/HEAD only) share the Flask app's caches, payload builders
+and response formatting, so their output matches the WSGI server's (health
+reports "server": "ASGI"):
+    /api/health
+    /api/hospitals/list
+    /api/blood-stock/<county>/<constituency>
+
+Every other route is handed to Flask on a pool of ASGI_WSGI_THREADS
+threads, so up to that many Flask requests run at once per process, as with
+gunicorn --threads. (asgiref's plain WsgiToAsgi would run them one at a
+time on a single shared thread.)
+"""
+
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+import app as uhai_app
+import metrics
+import structured_log
+from async_supabase import AsyncSupabaseClient
+
+log = structured_log.get_logger('asgi')
+
+ASYNC_POOL_SIZE = int(os.environ.get('SUPABASE_ASYNC_POOL_SIZE', 100))
+# Flask requests running at once in this process
+ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 20))
+
+supabase = AsyncSupabaseClient(
+    uhai_app.SUPABASE_URL,
+    uhai_app.SUPABASE_KEY,
+    pool_size=ASYNC_POOL_SIZE,
+    timeout=uhai_app.SUPABASE_TIMEOUT,
+    breaker=uhai_app.supabase_breaker,
+    retry=uhai_app.supabase_retry
+)
+
+
+# ============================================
+# FLASK BRIDGE
+# ============================================
+class ThreadPoolWsgiInstance(WsgiToAsgiInstance):
+    """One request to the WSGI app, run on the bridge's executor"""
+
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body):
+        # The parent method is wrapped in a thread-sensitive sync_to_async,
+        # which would serialize every request on one thread
+        run = WsgiToAsgiInstance.__dict__['run_wsgi_app'].func
+        await sync_to_async(run, thread_sensitive=False, executor=self.executor)(self, body)
+
+
+class ThreadPoolWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi that runs requests concurrently on a bounded thread pool"""
+
+    def __init__(self, wsgi_application, threads):
+        super().__init__(wsgi_application)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi-wsgi')
+
+    async def __call__(self, scope, receive, send):
+        await ThreadPoolWsgiInstance(self.wsgi_application, self.executor)(scope, receive, send)
+
+
+flask_application = ThreadPoolWsgiToAsgi(uhai_app.app, ASGI_WSGI_THREADS)
+
+
+# ============================================
+# RESPONSES
+# ============================================
+def get_header(scope, name):
+    """Return a request header value (bytes) or None"""
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value
+    return None
+
+
+async def send_body(scope, send, body, status=200, content_type=b'application/json', extra_headers=()):
+    """Send a complete response, adding the same CORS headers as flask-cors"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+
+    headers = [
+        (b'content-type', content_type),
+        (b'content-length', str(len(body)).encode())
+    ]
+    headers += list(extra_headers)
+    origin = get_header(scope, b'origin')
+    if origin:
+        headers += [
+            (b'access-control-allow-origin', origin),
+            (b'access-control-allow-credentials', b'true'),
+            (b'vary', b'Origin')
+        ]
+
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+
+async def send_json(scope, send, payload, status=200):
+    await send_body(scope, send, uhai_app.app.json.dumps(payload) + '\n', status)
+
+
+async def send_stale(scope, send, key, fallback):
+    """Last-known-good body for key (flagged stale), or the fallback payload"""
+    body = uhai_app.public_last_good.get(key)
+    if body is None:
+        await send_json(scope, send, fallback)
+        return
+    await send_body(scope, send, body, extra_headers=[(b'warning', b'110 - "Response is Stale"')])
+
+
+def etag_matches(scope, etag):
+    """True if the request's If-None-Match names this (unquoted) etag"""
+    header = get_header(scope, b'if-none-match')
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.decode('latin-1').split(',')]
+    return '*' in candidates or f'"{etag}"' in candidates or f'W/"{etag}"' in candidates
+
+
+async def send_validated(scope, send, body, etag, cache_control, content_type=b'application/json'):
+    """Send body with a strong ETag, or an empty 304 if the client already has it"""
+    headers = [(b'etag', f'"{etag}"'.encode()), (b'cache-control', cache_control)]
+    if etag_matches(scope, etag):
+        await send_body(scope, send, b'', status=304, content_type=content_type, extra_headers=headers)
+    else:
+        await send_body(scope, send, body, content_type=content_type, extra_headers=headers)
+
+
+def route_budget(name):
+    return uhai_app.ROUTE_TIMEOUT_BUDGETS.get(name, uhai_app.SUPABASE_DEFAULT_BUDGET)
+
+
+# ============================================
+# NATIVE ROUTES
+# ============================================
+async def health(scope, send):
+    """Health check endpoint (same fields as the WSGI app's)"""
+    await send_json(scope, send, uhai_app.health_payload('ASGI'))
+
+
+async def hospitals_list(scope, send):
+    """Get list of all verified hospitals (shares the WSGI app's versioned cache)"""
+    loaded = uhai_app.cached_hospitals_list()
+    if loaded is None:
+        version = await supabase.request('POST', uhai_app.VERIFIED_HOSPITALS_VERSION_RPC, {},
+                                         timeout=route_budget('get_hospitals_list'))
+        version = version if isinstance(version, str) else None
+        loaded = uhai_app.revalidate_hospitals_list(version)
+        if loaded is None:
+            hospitals = await supabase.request('GET', uhai_app.VERIFIED_HOSPITALS_QUERY,
+                                               timeout=route_budget('get_hospitals_list'))
+            if hospitals is None:
+                await send_stale(scope, send, 'hospitals_list', {'success': True, 'hospitals': []})
+                return
+            loaded = uhai_app.store_hospitals_list(hospitals, version)
+
+    body, etag = loaded
+    await send_validated(scope, send, body, etag, b'no-cache')
+
+
+async def blood_stock(scope, send, county, constituency):
+    """Get blood stock for a specific location (shares the WSGI app's cache)"""
+    cache = uhai_app.blood_stock_cache
+    cache_key = (county, constituency)
+    body = cache.get(cache_key)
+
+    if body is None:
+        generation = cache.generation
+        hospitals = await supabase.request('GET', uhai_app.blood_stock_query(county, constituency),
+                                           timeout=route_budget('get_blood_stock'))
+        if hospitals is None:
+            await send_stale(scope, send, ('blood_stock', county, constituency), {'hospitals': []})
+            return
+        body = uhai_app.blood_stock_body(hospitals)
+        cache.set(cache_key, body, generation=generation)
+        uhai_app.public_last_good.set(('blood_stock', county, constituency), body)
+
+    await send_body(scope, send, body)
+
+
+# (pattern, handler, Flask endpoint name used as the metrics route label)
+ROUTES = [
+    (re.compile(r'^/api/health$'), health, 'health'),
+    (re.compile(r'^/api/hospitals/list$'), hospitals_list, 'get_hospitals_list'),
+    (re.compile(r'^/api/blood-stock/([^/]+)/([^/]+)$'), blood_stock, 'get_blood_stock')
+]
+
+
+# ============================================
+# APPLICATION
+# ============================================
+async def lifespan(receive, send):
+    """Open the async pool at startup and close it on shutdown"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await supabase.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await supabase.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def run_native(scope, send, handler, endpoint, args):
+    """Run a native route with the same request id and metrics as Flask routes"""
+    started = time.perf_counter()
+    status = [500]
+    request_id = structured_log.request_id_from((get_header(scope, b'x-request-id') or b'').decode('latin-1'))
+    structured_log.request_id_var.set(request_id)
+
+    async def send_and_record(message):
+        if message['type'] == 'http.response.start':
+            status[0] = message['status']
+            message['headers'] = list(message['headers']) + [(b'x-request-id', request_id.encode())]
+        await send(message)
+
+    metrics.REQUESTS_IN_FLIGHT.inc()
+    try:
+        await handler(scope, send_and_record, *args)
+    except Exception as e:
+        log.exception('ASGI route error: %s', e)
+        await send_json(scope, send_and_record, {'success': False, 'error': str(e)}, 500)
+    finally:
+        metrics.REQUESTS_IN_FLIGHT.dec()
+        metrics.observe_request(endpoint, scope['method'], status[0], time.perf_counter() - started)
+
+
+async def application(scope, receive, send):
+    """ASGI application: native coroutine routes first, then Flask"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+        for pattern, handler, endpoint in ROUTES:
+            match = pattern.match(scope['path'])
+            if match:
+                await run_native(scope, send, handler, endpoint, match.groups())
+                return
+
+    await flask_application(scope, receive, send)
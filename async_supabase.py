@@ -0,0 +1,154 @@
+"""
+UHAI DAMU - Async Supabase REST client
+Coroutine counterpart of app.supabase_request for the ASGI serving mode.
+"""
+
+import asyncio
+import time
+
+import httpx
+
+import json_provider
+import metrics
+from structured_log import get_logger
+
+log = get_logger('async_supabase')
+
+
+class AsyncSupabaseClient:
+    """Pooled HTTP/1.1 keep-alive client for the Supabase REST API.
+
+    Mirrors supabase_request(): parsed JSON on success, [] for an empty body
+    and None on any HTTP or network error. One client is shared by every
+    coroutine in the process, so hundreds of requests can wait on Supabase
+    at once without holding a thread each.
+
+    An optional resilience.CircuitBreaker is consulted before every call and
+    told about timeouts, network errors and 5xx responses. An optional
+    resilience.RetryPolicy retries GET/HEAD calls on the same conditions.
+    """
+
+    RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+    def __init__(self, base_url, api_key, pool_size=100, timeout=30, breaker=None, retry=None, transport=None):
+        self.base_url = f"{base_url}/rest/v1/"
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.breaker = breaker
+        self.retry = retry
+        self.transport = transport
+        self._client = None
+
+    async def start(self):
+        """Open the connection pool (call once from the ASGI lifespan)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    'apikey': self.api_key,
+                    'Authorization': f'Bearer {self.api_key}',
+                    'Content-Type': 'application/json',
+                    'Prefer': 'return=representation'
+                },
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                timeout=self.timeout,
+                transport=self.transport
+            )
+        return self
+
+    async def close(self):
+        """Close every pooled connection"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def send(self, method, endpoint, timeout=None, **kwargs):
+        """Send one request through the breaker and retry policy; None if refused or failed"""
+        await self.start()
+        retryable = self.retry is not None and method in ('GET', 'HEAD')
+        attempts = self.retry.attempts if retryable else 1
+
+        for attempt in range(attempts):
+            if attempt > 0:
+                await asyncio.sleep(self.retry.backoff(attempt - 1))
+
+            permit = self.breaker.allow() if self.breaker is not None else True
+            if not permit:
+                log.warning('Supabase circuit open, skipping: %s %s', method, endpoint)
+                return None
+
+            try:
+                started = time.perf_counter()
+                try:
+                    response = await self._client.request(
+                        method,
+                        endpoint,
+                        timeout=self.timeout if timeout is None else timeout,
+                        **kwargs
+                    )
+                except httpx.HTTPError as e:
+                    metrics.observe_supabase('asgi', 'error', time.perf_counter() - started)
+                    if self.breaker is not None:
+                        self.breaker.record_failure()
+                    log.warning('Supabase request error (attempt %d): %s', attempt + 1, e)
+                    continue
+
+                metrics.observe_supabase('asgi', metrics.status_class(response.status_code), time.perf_counter() - started)
+                if self.breaker is not None:
+                    if response.status_code >= 500:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+            finally:
+                # Also on cancellation, so a half-open trial slot is never lost
+                if self.breaker is not None:
+                    self.breaker.release(permit)
+
+            if retryable and response.status_code in self.RETRY_STATUS_CODES and attempt + 1 < attempts:
+                continue
+            return response
+
+        return None
+
+    async def request(self, method, endpoint, data=None, params=None, timeout=None):
+        """Make an HTTP request to the Supabase REST API"""
+        if method not in ('GET', 'POST', 'PATCH', 'PUT', 'DELETE'):
+            return None
+
+        try:
+            response = await self.send(
+                method,
+                endpoint,
+                timeout=timeout,
+                params=params if method == 'GET' else None,
+                content=json_provider.dumps_bytes(data) if data is not None and method in ('POST', 'PATCH', 'PUT') else None
+            )
+            if response is None:
+                return None
+
+            if response.status_code >= 400:
+                log.error('Supabase error: %d - %s', response.status_code, response.text[:500])
+                return None
+
+            return json_provider.loads(response.content) if response.content else []
+        except Exception as e:
+            log.error('Supabase request error: %s', e)
+            return None
+
+    async def count(self, endpoint, timeout=None):
+        """Exact row count via HEAD + Prefer: count=exact (None on error)"""
+        try:
+            response = await self.send('HEAD', endpoint, timeout=timeout, headers={'Prefer': 'count=exact'})
+            if response is None:
+                return None
+
+            if response.status_code >= 400:
+                log.error('Supabase count error: %d - %s', response.status_code, endpoint)
+                return None
+
+            total = response.headers.get('Content-Range', '').rpartition('/')[2]
+            return int(total) if total.isdigit() else None
+        except Exception as e:
+            log.error('Supabase count error: %s', e)
+            return None
@@ -0,0 +1,55 @@
+"""
+UHAI DAMU - /api/admin/appointments round-trip benchmark
+Counts Supabase calls per request for growing appointment tables.
+
+Run from the project root:
+    python benchmarks/bench_admin_appointments.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+import app as uhai_app
+from fake_postgrest import DEFAULT_RELATIONS, FakePostgREST, install, seed_demo_data
+
+# Simulated network round trip to Supabase
+ROUND_TRIP_SECONDS = 0.002
+
+
+def run(num_appointments, allow_embedding):
+    # Without the appointments -> users foreign key PostgREST rejects the
+    # embedded query and the endpoint falls back to batched id lookups
+    relations = DEFAULT_RELATIONS if allow_embedding else [
+        r for r in DEFAULT_RELATIONS if r != ('appointments', 'donor_id', 'users')]
+    fake = FakePostgREST(relations=relations, latency=ROUND_TRIP_SECONDS)
+    seed_demo_data(fake, donors=max(num_appointments // 4, 1), hospitals=10, appointments=num_appointments)
+    install(fake, uhai_app)
+
+    client = uhai_app.app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 'admin'
+        sess['user_type'] = 'admin'
+
+    fake.reset_stats()
+    start = time.perf_counter()
+    response = client.get('/api/admin/appointments')
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 200, response.status_code
+    assert response.json['count'] == num_appointments
+    assert all(a['donor_name'] != 'Unknown' for a in response.json['appointments'])
+    return fake.calls, elapsed
+
+
+if __name__ == '__main__':
+    print(f"{'rows':>6} {'mode':>10} {'calls':>6} {'ms':>9}")
+    for n in (10, 100, 1000, 2000):
+        for embedding in (True, False):
+            calls, elapsed = run(n, embedding)
+            mode = 'embedded' if embedding else 'batched'
+            print(f"{n:>6} {mode:>10} {calls:>6} {elapsed * 1000:>9.1f}")
+    print("\nBefore this change the endpoint made 1 + 2 * rows calls (4,001 for 2,000 rows).")
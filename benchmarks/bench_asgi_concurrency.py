@@ -0,0 +1,69 @@
+"""
+UHAI DAMU - ASGI bridge concurrency check
+Sends concurrent POST /api/donor/login requests through asgi.application
+with a slow Supabase stand-in. Flask routes run on the bridge's thread
+pool, so the batch should take about one upstream round trip, not one per
+request.
+
+Run from the project root:
+    python benchmarks/bench_asgi_concurrency.py
+    python benchmarks/bench_asgi_concurrency.py --requests 20 --latency 0.5
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+import app as uhai_app
+import asgi
+from fake_postgrest import DEMO_PASSWORD, FakePostgREST, install, seed_demo_data
+
+
+async def login_batch(count):
+    transport = httpx.ASGITransport(app=asgi.application)
+    async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+        async def login(i):
+            response = await client.post('/api/donor/login',
+                                         json={'email': f'donor{i}@example.com', 'password': DEMO_PASSWORD})
+            return response.status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(login(i) for i in range(count)))
+        return statuses, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent Flask routes through the ASGI bridge')
+    parser.add_argument('--requests', type=int, default=6)
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds added to every Supabase call')
+    args = parser.parse_args()
+
+    # Logins from one test client would otherwise share one IP bucket
+    uhai_app.LOGIN_THROTTLE_ENABLED = False
+    fake = FakePostgREST(latency=args.latency)
+    seed_demo_data(fake, donors=args.requests, hospitals=1, appointments=0)
+    install(fake, uhai_app)
+
+    fake.reset_stats()
+    statuses, wall = asyncio.run(login_batch(args.requests))
+    serialized = fake.calls * args.latency
+
+    print(f"{args.requests} concurrent logins, {args.latency:.2f} s per Supabase call, "
+          f"{asgi.ASGI_WSGI_THREADS} bridge threads")
+    print(f"statuses: {sorted(set(statuses))}")
+    print(f"wall time {wall:.2f} s (one at a time would take ~{serialized:.2f} s)")
+    if any(status != 200 for status in statuses):
+        sys.exit('some logins failed')
+    if wall > serialized / 2:
+        sys.exit('Flask routes are not running concurrently')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+UHAI DAMU - JSON provider microbenchmark
+Encodes and decodes a 10,000-row /api/admin/users payload with Flask's
+default (stdlib) provider and with json_provider.FastJSONProvider, then
+times the whole endpoint with the stand-in's answer replayed, so only the
+app's own work is measured.
+
+Run from the project root:
+    python benchmarks/bench_json.py
+    python benchmarks/bench_json.py --rows 50000 --repeat 5
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import time
+
+import requests
+from flask.json.provider import DefaultJSONProvider
+
+import app as uhai_app
+import json_provider
+from fake_postgrest import FakePostgREST, FakePostgRESTAdapter, seed_demo_data
+
+
+class ReplayAdapter(FakePostgRESTAdapter):
+    """Answers each GET URL once from the stand-in, then replays that answer"""
+
+    def __init__(self, fake):
+        super().__init__(fake)
+        self.answers = {}
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, **kwargs)
+        if request.url not in self.answers:
+            self.answers[request.url] = super().send(request, **kwargs)
+        answer = self.answers[request.url]
+        response = requests.Response()
+        response.status_code, response.headers, response._content = answer.status_code, answer.headers, answer.content
+        response.encoding, response.url, response.request = answer.encoding, request.url, request
+        return response
+
+
+def best_of(repeat, fn):
+    """Fastest of `repeat` runs, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def use_backend(backend):
+    json_provider.BACKEND = backend
+    if backend == 'orjson':
+        uhai_app.app.json = json_provider.FastJSONProvider(uhai_app.app)
+    else:
+        uhai_app.app.json = DefaultJSONProvider(uhai_app.app)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='stdlib vs orjson on the admin users payload')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    if json_provider.orjson is None:
+        sys.exit('orjson is not installed; nothing to compare')
+
+    fake = FakePostgREST()
+    seed_demo_data(fake, donors=args.rows, hospitals=5, appointments=0)
+    uhai_app.get_http_session().mount(uhai_app.SUPABASE_URL, ReplayAdapter(fake))
+
+    # What Supabase returns for users?select=*,donors(*)
+    status, headers, upstream_body = fake.handle(
+        'GET', '/rest/v1/users', 'select=*,donors(*)&user_type=eq.donor&order=created_at.desc',
+        simulate_latency=False)
+    upstream = requests.Response()
+    upstream.status_code, upstream._content = status, upstream_body
+    upstream.headers.update(headers)
+
+    client = uhai_app.app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 'admin'
+        sess['user_type'] = 'admin'
+    payload = client.get('/api/admin/users').get_json()
+    assert len(payload['users']) == args.rows
+
+    print(f"{args.rows} donor rows: upstream body {len(upstream_body) / 1024:.0f} KiB, "
+          f"response {len(json.dumps(payload)) / 1024:.0f} KiB (best of {args.repeat})\n")
+    print(f"{'':32} {'stdlib ms':>10} {'orjson ms':>10} {'speedup':>8}")
+
+    results = {}
+    for backend in ('stdlib', 'orjson'):
+        use_backend(backend)
+        timings = results[backend] = {}
+        with uhai_app.app.test_request_context():
+            timings['jsonify(users)'] = best_of(args.repeat, lambda: uhai_app.app.json.response(payload))
+        timings['parse upstream body'] = best_of(
+            args.repeat,
+            upstream.json if backend == 'stdlib' else lambda: json_provider.loads(upstream.content))
+        response_body = client.get('/api/admin/users').data
+        # What request.get_json() calls for a 10k-row body
+        timings['parse request body'] = best_of(args.repeat, lambda: uhai_app.app.json.loads(response_body))
+        timings['GET /api/admin/users'] = best_of(args.repeat, lambda: client.get('/api/admin/users'))
+
+    for name in results['stdlib']:
+        before, after = results['stdlib'][name], results['orjson'][name]
+        print(f"{name:32} {before:>10.1f} {after:>10.1f} {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
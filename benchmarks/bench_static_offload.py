@@ -0,0 +1,206 @@
+"""
+UHAI DAMU - Static file offload benchmark
+Worker-seconds spent delivering the HTML/CSS/JS pages with and without a
+front proxy taking over the bytes (STATIC_OFFLOAD=x-accel).
+
+A small threaded server stands in for nginx + gunicorn: at most --workers
+requests run the Flask app at once, and a "worker" stays busy until the
+body has been written to the client, like a gunicorn sync worker. With
+X-Accel-Redirect the worker is released after the headers and the stand-in
+proxy sends the file from the built tree with sendfile().
+
+Clients read at --client-kbps through small socket buffers, so slow mobile
+clients hold a worker for as long as the body does not fit in the buffers.
+
+Run from the project root:
+    python benchmarks/bench_static_offload.py
+    python benchmarks/bench_static_offload.py --client-kbps 0 --rounds 10
+
+With the defaults (40 KiB/s clients, 2 workers) send_from_directory kept the
+workers busy ~60 ms per file, the in-memory cache ~4 ms and X-Accel-Redirect
+under 1 ms.
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import argparse
+import re
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from werkzeug.test import EnvironBuilder
+
+import app as uhai_app
+
+MODES = ('disk', 'memory', 'x-accel')
+
+
+class Proxy(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, workers, build_dir, send_buffer):
+        super().__init__(('127.0.0.1', 0), ProxyHandler)
+        self.workers = threading.BoundedSemaphore(workers)
+        self.build_dir = build_dir
+        self.send_buffer = send_buffer
+        self.worker_seconds = 0.0
+        self.proxy_seconds = 0.0
+        self.lock = threading.Lock()
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, server.send_buffer)
+
+        with server.workers:
+            started = time.perf_counter()
+            environ = EnvironBuilder(path=self.path, headers=dict(self.headers)).get_environ()
+            captured = {}
+
+            def start_response(status, headers, exc_info=None):
+                captured['status'], captured['headers'] = status, headers
+
+            body = uhai_app.app(environ, start_response)
+            headers = dict(captured['headers'])
+            accel = headers.get('X-Accel-Redirect')
+            try:
+                if accel is None:
+                    self.write_head(captured['status'], captured['headers'])
+                    for chunk in body:
+                        self.wfile.write(chunk)
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+            elapsed = time.perf_counter() - started
+        with server.lock:
+            server.worker_seconds += elapsed
+
+        if accel is not None:
+            started = time.perf_counter()
+            self.send_internal(unquote(accel[len(uhai_app.STATIC_OFFLOAD_PREFIX):]), headers)
+            with server.lock:
+                server.proxy_seconds += time.perf_counter() - started
+
+    def write_head(self, status, headers):
+        lines = [f'HTTP/1.0 {status}'] + [f'{name}: {value}' for name, value in headers]
+        self.wfile.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+
+    def send_internal(self, name, upstream_headers):
+        """What nginx does for the internal location: gzip_static + sendfile"""
+        path = os.path.join(self.server.build_dir, name)
+        headers = [('Content-Type', upstream_headers['Content-Type']),
+                   ('Cache-Control', upstream_headers['Cache-Control'])]
+        if 'gzip' in self.headers.get('Accept-Encoding', '') and os.path.exists(path + '.gz'):
+            path += '.gz'
+            headers.append(('Content-Encoding', 'gzip'))
+        headers.append(('Content-Length', str(os.path.getsize(path))))
+        self.write_head('200 OK', headers)
+        self.wfile.flush()
+        with open(path, 'rb') as f:
+            self.connection.sendfile(f)
+
+
+def fetch(port, path, client_kbps, receive_buffer):
+    """GET path like a slow mobile client; returns bytes received"""
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+    sock.connect(('127.0.0.1', port))
+    sock.sendall(f'GET {path} HTTP/1.0\r\nHost: localhost\r\nAccept-Encoding: gzip\r\n\r\n'.encode())
+    received = 0
+    started = time.perf_counter()
+    with sock:
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return received
+            received += len(chunk)
+            if client_kbps:
+                ahead = received / (client_kbps * 1024) - (time.perf_counter() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+
+def asset_paths():
+    pages = sorted(f for f in os.listdir(ROOT_DIR) if f.endswith('.html'))
+    client = uhai_app.app.test_client()
+    assets = set(re.findall(r'(?:src|href)="((?:css|js)/[^"]+)"', client.get('/').get_data(as_text=True)))
+    return ['/' + name for name in pages + sorted(assets)]
+
+
+def run(mode, paths, args, build_dir):
+    uhai_app.STATIC_OFFLOAD = 'x-accel' if mode == 'x-accel' else ''
+    # 'disk': every file goes through send_from_directory, as before the static cache
+    uhai_app.static_files.max_file_size = 0 if mode == 'disk' else uhai_app.STATIC_CACHE_MAX_FILE
+    uhai_app.static_files._entries.clear()
+    uhai_app.static_files.total_bytes = 0
+
+    proxy = Proxy(args.workers, build_dir, args.send_buffer)
+    threading.Thread(target=proxy.serve_forever, daemon=True).start()
+    port = proxy.server_address[1]
+    requests = paths * args.rounds
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        received = sum(pool.map(lambda p: fetch(port, p, args.client_kbps, args.receive_buffer), requests))
+    wall = time.perf_counter() - started
+    proxy.shutdown()
+    proxy.server_close()
+    return {
+        'requests': len(requests),
+        'bytes': received,
+        'worker_seconds': proxy.worker_seconds,
+        'proxy_seconds': proxy.proxy_seconds,
+        'wall': wall
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Worker time for static files with and without X-Accel-Redirect')
+    parser.add_argument('--workers', type=int, default=2, help='concurrent app workers (gunicorn -w)')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--rounds', type=int, default=2, help='times every page and asset is fetched')
+    parser.add_argument('--client-kbps', type=float, default=40, help='client read rate in KiB/s (0 = unlimited)')
+    parser.add_argument('--send-buffer', type=int, default=4096, help='server socket send buffer (bytes)')
+    parser.add_argument('--receive-buffer', type=int, default=4096, help='client socket receive buffer (bytes)')
+    args = parser.parse_args()
+
+    build_dir = tempfile.mkdtemp(prefix='uhai-static-')
+    try:
+        uhai_app.static_files.build(build_dir)
+        paths = asset_paths()
+        print(f"{len(paths)} files x {args.rounds} rounds, {args.workers} workers, "
+              f"{args.concurrency} clients at {args.client_kbps or 'unlimited'} KiB/s\n")
+        print(f"{'mode':>8} {'requests':>9} {'KiB sent':>9} {'worker s':>9} {'ms/req':>8} {'proxy s':>8} {'wall s':>7}")
+        results = {}
+        for mode in MODES:
+            r = results[mode] = run(mode, paths, args, build_dir)
+            print(f"{mode:>8} {r['requests']:>9} {r['bytes'] / 1024:>9.0f} {r['worker_seconds']:>9.2f} "
+                  f"{r['worker_seconds'] / r['requests'] * 1000:>8.2f} {r['proxy_seconds']:>8.2f} {r['wall']:>7.2f}")
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    freed = results['disk']['worker_seconds'] - results['x-accel']['worker_seconds']
+    print(f"\nx-accel frees {freed:.2f} worker-seconds per {results['disk']['requests']} requests "
+          f"compared with send_from_directory "
+          f"({results['memory']['worker_seconds'] - results['x-accel']['worker_seconds']:.2f} "
+          f"compared with the in-memory cache).")
+
+
+if __name__ == '__main__':
+    main()
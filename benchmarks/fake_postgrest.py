@@ -0,0 +1,632 @@
+"""
+UHAI DAMU - In-process PostgREST stand-in
+In-memory tables answering the subset of the Supabase REST API that app.py
+uses, for offline benchmarks and load tests.
+
+Supported:
+    filters      col=eq|neq|gt|gte|lt|lte|in|is.value, not.<op>, embedded.col=...
+    select       columns, aliases (alias:col), embedded resources with
+                 aliases, !inner and foreign-key hints (users!donor_id(...))
+    order        order=col.asc|desc[,col...], limit, offset
+    writes       POST / PATCH / DELETE with Prefer: return=representation
+    counts       Prefer: count=exact on GET/HEAD -> Content-Range
+    rpc          POST rpc/<name> for functions registered in `rpc`
+
+Plugging it in:
+    fake = FakePostgREST(latency=0.02)
+    seed_demo_data(fake)
+    install(fake, app)                # requests session used by supabase_request
+    AsyncFakeTransport(fake)          # httpx transport for AsyncSupabaseClient
+
+Standalone server (point SUPABASE_URL at it):
+    python benchmarks/fake_postgrest.py --port 54321 --latency 0.03
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import functools
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.client import responses as HTTP_REASONS
+from urllib.parse import urlsplit, unquote
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# (child table, foreign key column, parent table); parents are keyed by `id`
+DEFAULT_RELATIONS = [
+    ('donors', 'id', 'users'),
+    ('hospitals', 'id', 'users'),
+    ('appointments', 'donor_id', 'users'),
+    ('appointments', 'hospital_id', 'hospitals'),
+    ('blood_stock', 'hospital_id', 'hospitals'),
+    ('doctors', 'hospital_id', 'hospitals')
+]
+
+RESERVED_PARAMS = ('select', 'order', 'limit', 'offset', 'on_conflict', 'columns')
+OPERATORS = ('eq', 'neq', 'gt', 'gte', 'lt', 'lte', 'in', 'is', 'like', 'ilike')
+
+
+class PostgRESTError(Exception):
+    """Error returned to the client as a PostgREST-style JSON body"""
+
+    def __init__(self, status, message, code='PGRST000'):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.code = code
+
+
+class InjectedTimeout(Exception):
+    """Raised by handle() when an injected delay exceeds the client timeout"""
+
+
+# ============================================
+# QUERY PARSING
+# ============================================
+def split_top_level(text, sep=','):
+    """Split on `sep` outside parentheses and double quotes"""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        if char == sep and depth == 0 and not quoted:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    if current:
+        parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def parse_select(text):
+    """Parse a select= value into column and embedded-resource items"""
+    items = []
+    for part in split_top_level(text or '*'):
+        if '(' in part:
+            head, inner = part[:part.index('(')], part[part.index('(') + 1:part.rindex(')')]
+            alias, _, head = head.rpartition(':') if ':' in head else ('', '', head)
+            table, *hints = head.split('!')
+            items.append({
+                'embed': True,
+                'table': table,
+                'alias': alias or table,
+                'inner': 'inner' in hints,
+                'hint': next((h for h in hints if h not in ('inner', 'left')), None),
+                'select': parse_select(inner) if inner.strip() else []
+            })
+        else:
+            alias, _, column = part.rpartition(':') if ':' in part.replace('::', '') else ('', '', part)
+            column = column.split('::')[0]
+            items.append({'embed': False, 'column': column, 'alias': alias or column})
+    return items
+
+
+@functools.lru_cache(maxsize=256)
+def parse_list(raw):
+    """Values of an in.(a,"b c",d) list"""
+    inner = raw.strip()
+    if inner.startswith('(') and inner.endswith(')'):
+        inner = inner[1:-1]
+    return tuple(value.strip().strip('"') for value in split_top_level(inner))
+
+
+def parse_query(query):
+    """Split a query string into reserved params and (path, column, op, value, negate) filters"""
+    params, filters = {}, []
+    for pair in query.split('&') if query else []:
+        if not pair:
+            continue
+        key, _, value = pair.partition('=')
+        key, value = unquote(key), unquote(value)
+        if key in RESERVED_PARAMS:
+            params[key] = value
+            continue
+
+        negate = value.startswith('not.')
+        if negate:
+            value = value[4:]
+        op, _, operand = value.partition('.')
+        if op not in OPERATORS:
+            raise PostgRESTError(400, f'"failed to parse filter ({value})"', 'PGRST100')
+        *path, column = key.split('.')
+        filters.append((tuple(path), column, op, operand, negate))
+    return params, filters
+
+
+# ============================================
+# VALUE MATCHING
+# ============================================
+def values_equal(value, raw):
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return raw.lower() == str(value).lower()
+    if isinstance(value, (int, float)):
+        try:
+            return float(raw) == value
+        except ValueError:
+            return False
+    return str(value) == raw
+
+
+def compare(value, raw):
+    """Order `value` against the raw filter operand using the value's type"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (value > float(raw)) - (value < float(raw))
+    value = str(value)
+    return (value > raw) - (value < raw)
+
+
+def like(value, pattern, case_sensitive=True):
+    pattern = pattern.replace('%', '*').replace('_', '?')
+    if not case_sensitive:
+        value, pattern = value.lower(), pattern.lower()
+    return fnmatch.fnmatchcase(value, pattern)
+
+
+def matches(value, op, raw):
+    if op == 'eq':
+        return values_equal(value, raw)
+    if op == 'neq':
+        return value is not None and not values_equal(value, raw)
+    if op == 'in':
+        return any(values_equal(value, option) for option in parse_list(raw))
+    if op == 'is':
+        lowered = raw.lower()
+        return value is None if lowered == 'null' else value is (lowered == 'true')
+    if value is None:
+        return False
+    if op in ('like', 'ilike'):
+        return like(str(value), raw, op == 'like')
+    result = compare(value, raw)
+    return {'gt': result > 0, 'gte': result >= 0, 'lt': result < 0, 'lte': result <= 0}[op]
+
+
+def sort_key(value):
+    # None sorts last ascending (PostgreSQL NULLS LAST default)
+    return (value is None, value if not isinstance(value, bool) else int(value))
+
+
+# ============================================
+# FAKE SERVER
+# ============================================
+class FakePostgREST:
+    """In-memory PostgREST with configurable latency and error injection.
+
+    latency     seconds added to every call (before the response is built)
+    jitter      extra uniformly random delay in [0, jitter]
+    error_rate  probability that a call fails with a 503
+    fail_next() queue specific failures (status code or 'timeout')
+    """
+
+    def __init__(self, tables=None, relations=None, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        self.tables = {name: [dict(row) for row in rows] for name, rows in (tables or {}).items()}
+        self.relations = list(DEFAULT_RELATIONS if relations is None else relations)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.rpc = {
+            'blood_stock_summary': rpc_blood_stock_summary,
+            'verified_hospitals_version': rpc_verified_hospitals_version
+        }
+        self.calls = 0
+        self.log = []
+        self._forced_errors = []
+        self._lock = threading.RLock()
+
+    # ---------- configuration ----------
+    def table(self, name):
+        return self.tables.setdefault(name, [])
+
+    def fail_next(self, count=1, status=503):
+        """Make the next `count` calls fail with `status` (or 'timeout')"""
+        with self._lock:
+            self._forced_errors.extend([status] * count)
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = 0
+            self.log = []
+
+    def next_delay(self):
+        return self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+
+    # ---------- entry point ----------
+    def handle(self, method, path, query='', headers=None, body=b'', timeout=None, simulate_latency=True):
+        """Answer one request; returns (status, headers dict, body bytes)"""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        with self._lock:
+            self.calls += 1
+            self.log.append((method, f"{path}?{query}" if query else path))
+            forced = self._forced_errors.pop(0) if self._forced_errors else None
+            if forced is None and self.error_rate and self.random.random() < self.error_rate:
+                forced = 503
+
+        if simulate_latency:
+            delay = self.next_delay()
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                raise InjectedTimeout(f"{method} {path} exceeded {timeout}s")
+            if delay:
+                time.sleep(delay)
+
+        if forced == 'timeout':
+            raise InjectedTimeout(f"{method} {path} (injected)")
+        if forced is not None:
+            return self._json(forced, {'code': 'PGRST000', 'message': 'Injected failure'})
+
+        try:
+            with self._lock:
+                return self._dispatch(method, path, query, headers, body)
+        except PostgRESTError as e:
+            return self._json(e.status, {'code': e.code, 'message': e.message, 'details': None, 'hint': None})
+
+    def _dispatch(self, method, path, query, headers, body):
+        resource = path.split('/rest/v1/', 1)[-1].strip('/')
+        prefer = headers.get('prefer', '')
+        params, filters = parse_query(query)
+
+        if resource.startswith('rpc/'):
+            name = resource[4:]
+            if name not in self.rpc:
+                raise PostgRESTError(404, f"Could not find the function public.{name}", 'PGRST202')
+            args = json.loads(body) if body else {}
+            return self._json(200, self.rpc[name](self, args))
+
+        if resource not in self.tables:
+            raise PostgRESTError(404, f'relation "public.{resource}" does not exist', '42P01')
+
+        if method in ('GET', 'HEAD'):
+            rows, total, start = self.select(resource, params, filters)
+            status, response_headers, content = self._json(200, rows)
+            end = start + len(rows) - 1
+            count = str(total) if 'count=exact' in prefer else '*'
+            response_headers['Content-Range'] = f"{start}-{end}/{count}" if rows else f"*/{count}"
+            return status, response_headers, b'' if method == 'HEAD' else content
+
+        if method == 'POST':
+            payload = json.loads(body) if body else []
+            rows = self.insert(resource, payload if isinstance(payload, list) else [payload])
+            return self._written(201, rows, prefer)
+
+        if method == 'PATCH':
+            changes = json.loads(body) if body else {}
+            rows = [row for row in self.tables[resource] if self._row_matches(resource, row, filters)]
+            for row in rows:
+                row.update(changes)
+            return self._written(200, [dict(row) for row in rows], prefer)
+
+        if method == 'DELETE':
+            kept, deleted = [], []
+            for row in self.tables[resource]:
+                (deleted if self._row_matches(resource, row, filters) else kept).append(row)
+            self.tables[resource] = kept
+            return self._written(200, deleted, prefer)
+
+        raise PostgRESTError(405, f"Method {method} is not supported by the fake", 'PGRST117')
+
+    def _written(self, status, rows, prefer):
+        if 'return=representation' in prefer:
+            return self._json(status, rows)
+        return (201 if status == 201 else 204), {}, b''
+
+    @staticmethod
+    def _json(status, payload):
+        return status, {'Content-Type': 'application/json; charset=utf-8'}, json.dumps(payload, default=str).encode()
+
+    # ---------- reads ----------
+    def columns(self, table):
+        names = set()
+        for row in self.tables.get(table, []):
+            names.update(row)
+        return names
+
+    def _row_matches(self, table, row, filters, path=()):
+        for filter_path, column, op, raw, negate in filters:
+            if filter_path != path:
+                continue
+            if column not in row and self.tables.get(table) and column not in self.columns(table):
+                raise PostgRESTError(400, f'column {table}.{column} does not exist', '42703')
+            if matches(row.get(column), op, raw) == negate:
+                return False
+        return True
+
+    def relation(self, table, target, hint=None):
+        """Return (kind, column): ('one', fk on table) or ('many', fk on target)"""
+        candidates = [('one', column) for child, column, parent in self.relations
+                      if child == table and parent == target]
+        candidates += [('many', column) for child, column, parent in self.relations
+                       if child == target and parent == table]
+        if hint:
+            candidates = [c for c in candidates if c[1] == hint]
+        if not candidates:
+            raise PostgRESTError(400, f"Could not find a relationship between '{table}' and '{target}'", 'PGRST200')
+        if len(candidates) > 1:
+            raise PostgRESTError(300, f"More than one relationship was found for '{table}' and '{target}'", 'PGRST201')
+        return candidates[0]
+
+    def select(self, table, params, filters):
+        rows = [row for row in self.tables[table] if self._row_matches(table, row, filters)]
+
+        for part in reversed(split_top_level(params.get('order', ''))):
+            column, *modifiers = part.split('.')
+            rows.sort(key=lambda row: sort_key(row.get(column)), reverse='desc' in modifiers)
+
+        items = parse_select(params.get('select', '*'))
+        shaped = []
+        for row in rows:
+            result = self.shape(table, row, items, filters, ())
+            if result is not None:
+                shaped.append(result)
+
+        total = len(shaped)
+        start = int(params.get('offset', 0))
+        end = start + int(params['limit']) if 'limit' in params else None
+        return shaped[start:end], total, start
+
+    def shape(self, table, row, items, filters, path):
+        """Project one row; returns None if an !inner embed has no match"""
+        result = {}
+        for item in items:
+            if not item['embed']:
+                if item['column'] == '*':
+                    result.update(row)
+                else:
+                    result[item['alias']] = row.get(item['column'])
+                continue
+
+            target = item['table']
+            kind, column = self.relation(table, target, item['hint'])
+            embed_path = path + (item['alias'],)
+            embed_filters = [((),) + f[1:] for f in filters if f[0] in (embed_path, path + (target,))]
+            nested_filters = [f for f in filters if f[0][:len(embed_path)] == embed_path and len(f[0]) > len(embed_path)]
+
+            if kind == 'one':
+                candidates = [r for r in self.tables.get(target, []) if r.get('id') == row.get(column)]
+            else:
+                candidates = [r for r in self.tables.get(target, []) if r.get(column) == row.get('id')]
+            candidates = [r for r in candidates if self._row_matches(target, r, embed_filters)]
+
+            embedded = []
+            for candidate in candidates:
+                nested = self.shape(target, candidate, item['select'] or [{'embed': False, 'column': '*', 'alias': '*'}],
+                                    nested_filters, embed_path)
+                if nested is not None:
+                    embedded.append(nested)
+
+            if item['inner'] and not embedded:
+                return None
+            result[item['alias']] = (embedded[0] if embedded else None) if kind == 'one' else embedded
+        return result
+
+    # ---------- writes ----------
+    def insert(self, table, rows):
+        existing = {row.get('id') for row in self.tables[table]}
+        inserted = []
+        for row in rows:
+            row = dict(row)
+            row.setdefault('id', str(uuid.uuid4()))
+            if row['id'] in existing:
+                raise PostgRESTError(409, f'duplicate key value violates unique constraint "{table}_pkey"', '23505')
+            existing.add(row['id'])
+            inserted.append(row)
+        self.tables[table].extend(inserted)
+        return [dict(row) for row in inserted]
+
+    # ---------- WSGI ----------
+    def __call__(self, environ, start_response):
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        body = environ['wsgi.input'].read(length) if length else b''
+        headers = {key[5:].replace('_', '-'): value for key, value in environ.items() if key.startswith('HTTP_')}
+        try:
+            status, response_headers, content = self.handle(
+                environ['REQUEST_METHOD'], environ.get('PATH_INFO', ''), environ.get('QUERY_STRING', ''), headers, body)
+        except InjectedTimeout:
+            status, response_headers, content = 504, {}, b''
+        response_headers = dict(response_headers, **{'Content-Length': str(len(content))})
+        start_response(f"{status} {HTTP_REASONS.get(status, '')}", list(response_headers.items()))
+        return [content]
+
+
+def rpc_blood_stock_summary(fake, args):
+    """Mirror of Database/supabase_functions.sql blood_stock_summary()"""
+    threshold = args.get('critical_threshold', 3)
+    units = [row.get('units_available') or 0 for row in fake.tables.get('blood_stock', [])]
+    return [{'total_units': sum(units), 'critical_stock': sum(1 for u in units if u <= threshold)}]
+
+
+def rpc_verified_hospitals_version(fake, args):
+    """Mirror of Database/supabase_functions.sql verified_hospitals_version()"""
+    rows = sorted((str(h['id']), h.get('hospital_name') or '') for h in fake.tables.get('hospitals', [])
+                  if h.get('is_verified'))
+    return hashlib.md5(','.join(f'{i}:{name}' for i, name in rows).encode()).hexdigest()
+
+
+# ============================================
+# CLIENT TRANSPORTS
+# ============================================
+class FakePostgRESTAdapter(BaseAdapter):
+    """requests transport adapter that answers from a FakePostgREST"""
+
+    def __init__(self, fake):
+        super().__init__()
+        self.fake = fake
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        parts = urlsplit(request.url)
+        body = request.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+
+        try:
+            status, headers, content = self.fake.handle(
+                request.method, parts.path, parts.query, dict(request.headers), body, timeout=read_timeout)
+        except InjectedTimeout as e:
+            raise requests.ReadTimeout(str(e), request=request)
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = HTTP_REASONS.get(status, '')
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+if httpx is not None:
+    class AsyncFakeTransport(httpx.AsyncBaseTransport):
+        """httpx transport for AsyncSupabaseClient; latency is awaited, not slept"""
+
+        def __init__(self, fake):
+            self.fake = fake
+
+        async def handle_async_request(self, request):
+            body = await request.aread()
+            delay = self.fake.next_delay()
+            timeout = (request.extensions.get('timeout') or {}).get('read')
+            if timeout is not None and delay > timeout:
+                await asyncio.sleep(timeout)
+                raise httpx.ReadTimeout('Injected timeout', request=request)
+            if delay:
+                await asyncio.sleep(delay)
+
+            try:
+                status, headers, content = self.fake.handle(
+                    request.method, request.url.path, request.url.query.decode(), dict(request.headers), body,
+                    simulate_latency=False)
+            except InjectedTimeout as e:
+                raise httpx.ReadTimeout(str(e), request=request)
+            return httpx.Response(status, headers=headers, content=content, request=request)
+
+
+def install(fake, uhai_app):
+    """Route this process's supabase_request traffic to `fake`"""
+    uhai_app.get_http_session().mount(uhai_app.SUPABASE_URL, FakePostgRESTAdapter(fake))
+    return fake
+
+
+# ============================================
+# DEMO DATA
+# ============================================
+COUNTIES = {
+    'Nairobi City County': ['Westlands', 'Starehe', 'Kibra', 'Makadara', 'Dagoretti South'],
+    'Kiambu County': ['Thika Town', 'Ruiru', 'Juja', 'Kiambu', 'Kikuyu']
+}
+BLOOD_TYPES = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']
+DEMO_PASSWORD = 'Password123'
+
+
+def seed_demo_data(fake, donors=200, hospitals=20, appointments=2000, bcrypt_rounds=4, seed=0):
+    """Fill `fake` with realistic users, donors, hospitals, stock and appointments.
+
+    Every account uses DEMO_PASSWORD. Emails are donor<N>@example.com,
+    hospital<N>@example.com and admin@example.com.
+    """
+    import bcrypt
+
+    rng = random.Random(seed)
+    password_hash = bcrypt.hashpw(DEMO_PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=bcrypt_rounds)).decode('utf-8')
+    now = datetime(2026, 1, 1)
+    county_names = list(COUNTIES)
+
+    users = fake.table('users')
+    users.append({'id': str(uuid.UUID(int=rng.getrandbits(128))), 'email': 'admin@example.com',
+                  'password_hash': password_hash, 'full_name': 'Demo Admin', 'phone': '0700000000',
+                  'user_type': 'admin', 'county': county_names[0], 'created_at': now.isoformat()})
+
+    hospital_ids = []
+    for i in range(hospitals):
+        hospital_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        county = county_names[i % len(county_names)]
+        hospital_ids.append(hospital_id)
+        users.append({'id': hospital_id, 'email': f'hospital{i}@example.com', 'password_hash': password_hash,
+                      'full_name': f'Demo Hospital {i}', 'phone': f'020{i:07d}', 'user_type': 'hospital',
+                      'county': county, 'created_at': now.isoformat()})
+        # constituency is the optional column from Database/hospitals_constituency.sql
+        fake.table('hospitals').append({
+            'id': hospital_id, 'hospital_name': f'Demo Hospital {i}', 'constituency': rng.choice(COUNTIES[county]),
+            'contact_phone': f'+25420{i:07d}', 'address': f'{i} Hospital Rd', 'is_verified': i % 5 != 4})
+        for blood_type in BLOOD_TYPES:
+            units = rng.randint(0, 25)
+            fake.table('blood_stock').append({
+                'id': str(uuid.UUID(int=rng.getrandbits(128))), 'hospital_id': hospital_id, 'blood_type': blood_type,
+                'units_available': units, 'status': 'critical' if units <= 3 else 'low' if units <= 8 else 'adequate',
+                'last_updated': now.isoformat()})
+
+    donor_ids = []
+    for i in range(donors):
+        donor_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        county = county_names[i % len(county_names)]
+        donor_ids.append(donor_id)
+        users.append({'id': donor_id, 'email': f'donor{i}@example.com', 'password_hash': password_hash,
+                      'full_name': f'Demo Donor{i}', 'phone': f'07{i:08d}', 'user_type': 'donor',
+                      'county': county, 'created_at': (now + timedelta(minutes=i)).isoformat()})
+        fake.table('donors').append({
+            'id': donor_id, 'blood_type': rng.choice(BLOOD_TYPES), 'constituency': rng.choice(COUNTIES[county]),
+            'weight': rng.randint(50, 100), 'height': rng.randint(150, 195), 'is_active': True,
+            'tattoos_last_6months': False, 'alcohol_last_24hours': False, 'on_medication': False,
+            'health_issues': False})
+
+    for i in range(appointments):
+        fake.table('appointments').append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))), 'donor_id': rng.choice(donor_ids) if donor_ids else None,
+            'hospital_id': rng.choice(hospital_ids) if hospital_ids else None,
+            'appointment_date': (now + timedelta(days=i % 60)).date().isoformat(), 'appointment_time': '09:00',
+            'blood_type': rng.choice(BLOOD_TYPES), 'status': rng.choice(['pending', 'approved', 'rejected']),
+            'notes': '', 'created_at': (now + timedelta(seconds=i)).isoformat()})
+
+    fake.table('doctors')
+    return fake
+
+
+if __name__ == '__main__':
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+    parser = argparse.ArgumentParser(description='Serve an in-memory PostgREST stand-in')
+    parser.add_argument('--port', type=int, default=54321)
+    parser.add_argument('--latency', type=float, default=0.03, help='seconds added to every call')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--donors', type=int, default=200)
+    parser.add_argument('--hospitals', type=int, default=20)
+    parser.add_argument('--appointments', type=int, default=2000)
+    args = parser.parse_args()
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    fake = FakePostgREST(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    seed_demo_data(fake, args.donors, args.hospitals, args.appointments)
+    server = make_server('127.0.0.1', args.port, fake, server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    print(f"🧪 Fake PostgREST on http://127.0.0.1:{args.port}  (SUPABASE_URL for app.py)")
+    server.serve_forever()
@@ -0,0 +1,341 @@
+"""
+UHAI DAMU - Scenario load tests
+Drives app.py through realistic user journeys against the in-process
+PostgREST stand-in and reports throughput, latency percentiles and
+upstream (Supabase) calls per request for every route.
+
+Run from the project root:
+    python benchmarks/loadtest.py
+    python benchmarks/loadtest.py --duration 30 --concurrency 16 --latency 0.05
+    python benchmarks/loadtest.py --baseline benchmarks/results/previous.json
+
+Results are written as JSON (default benchmarks/results/loadtest-<time>.json)
+together with the thresholds from loadtest_thresholds.json. Any route over
+its threshold is listed under "violations" and makes the run exit with 1.
+"""
+
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import argparse
+import contextvars
+import itertools
+import json
+import random
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+# Simulated users log in to the same few seeded accounts far more often than
+# the per-email limit allows; measure the app, not the limiter
+os.environ.setdefault('LOGIN_THROTTLE_ENABLED', '0')
+
+import app as uhai_app
+from fake_postgrest import DEMO_PASSWORD, FakePostgREST, FakePostgRESTAdapter, seed_demo_data
+
+THRESHOLDS_FILE = os.path.join(BENCH_DIR, 'loadtest_thresholds.json')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Upstream calls made while serving the current request (fan-out threads
+# inherit the context, so their calls are counted too)
+upstream_counter = contextvars.ContextVar('upstream_counter', default=None)
+
+
+class CountingAdapter(FakePostgRESTAdapter):
+    """Fake transport that attributes every upstream call to the current request"""
+
+    def send(self, request, **kwargs):
+        counter = upstream_counter.get()
+        if counter is not None:
+            counter[0] += 1
+        return super().send(request, **kwargs)
+
+
+# ============================================
+# RECORDING
+# ============================================
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    """Thread-safe per-route samples of (latency seconds, upstream calls, ok)"""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, route, elapsed, calls, ok):
+        with self._lock:
+            self.samples.setdefault(route, []).append((elapsed, calls, ok))
+
+    def summary(self, wall_seconds):
+        routes = {}
+        all_latencies = []
+        total = errors = 0
+        for route, samples in sorted(self.samples.items()):
+            latencies = [s[0] * 1000 for s in samples]
+            calls = [s[1] for s in samples]
+            failed = sum(1 for s in samples if not s[2])
+            all_latencies += latencies
+            total += len(samples)
+            errors += failed
+            routes[route] = {
+                'requests': len(samples),
+                'errors': failed,
+                'p50_ms': round(percentile(latencies, 50), 2),
+                'p95_ms': round(percentile(latencies, 95), 2),
+                'p99_ms': round(percentile(latencies, 99), 2),
+                'upstream_calls_mean': round(sum(calls) / len(calls), 2),
+                'upstream_calls_max': max(calls)
+            }
+        return {
+            'requests': total,
+            'errors': errors,
+            'throughput_rps': round(total / wall_seconds, 2) if wall_seconds else 0,
+            'p50_ms': round(percentile(all_latencies, 50), 2),
+            'p95_ms': round(percentile(all_latencies, 95), 2),
+            'p99_ms': round(percentile(all_latencies, 99), 2),
+            'routes': routes
+        }
+
+
+class VirtualUser:
+    """One simulated browser: its own cookie jar, sending requests in sequence"""
+
+    def __init__(self, recorder, rng):
+        self.client = uhai_app.app.test_client()
+        # Its own client address, as forwarded by the front proxy
+        self.client.environ_base['HTTP_X_FORWARDED_FOR'] = f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}'
+        self.recorder = recorder
+        self.rng = rng
+
+    def request(self, route, method, url, **kwargs):
+        counter = [0]
+        token = upstream_counter.set(counter)
+        start = time.perf_counter()
+        try:
+            response = self.client.open(url, method=method, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            upstream_counter.reset(token)
+        ok = response.status_code < 400
+        self.recorder.add(route, elapsed, counter[0], ok)
+        return response
+
+
+# ============================================
+# SCENARIOS
+# ============================================
+class Dataset:
+    """Handles into the seeded data shared by all scenarios"""
+
+    def __init__(self, fake):
+        self.fake = fake
+        users = fake.tables['users']
+        self.donor_emails = [u['email'] for u in users if u['user_type'] == 'donor']
+        self.hospital_emails = [u['email'] for u in users if u['user_type'] == 'hospital']
+        self.admin_email = next(u['email'] for u in users if u['user_type'] == 'admin')
+        counties = {u['id']: u['county'] for u in users}
+        hospitals = fake.tables['hospitals']
+        self.hospital_names = [h['hospital_name'] for h in hospitals if h.get('is_verified')]
+        self.locations = sorted({(counties[h['id']], h['constituency']) for h in hospitals})
+        self._sequence = itertools.count()
+
+    def new_email(self):
+        return f"loadtest{next(self._sequence)}-{os.getpid()}@example.com"
+
+
+def donor_journey(user, data):
+    """Register -> login -> load dashboard -> book an appointment"""
+    email = data.new_email()
+    user.request('POST /api/donor/register', 'POST', '/api/donor/register', json={
+        'first_name': 'Load', 'last_name': 'Test', 'email': email, 'phone': '0712345678',
+        'blood_type': user.rng.choice(['O+', 'A+', 'B+', 'AB-']), 'password': DEMO_PASSWORD,
+        'county': data.locations[0][0]
+    })
+    user.request('POST /api/donor/login', 'POST', '/api/donor/login', json={'email': email, 'password': DEMO_PASSWORD})
+    user.request('GET /api/donor/profile', 'GET', '/api/donor/profile')
+    user.request('GET /api/hospitals/list', 'GET', '/api/hospitals/list')
+    user.request('POST /api/appointments/create', 'POST', '/api/appointments/create', json={
+        'hospital_id': user.rng.choice(data.hospital_names), 'date': '2026-03-01', 'time': '10:00'
+    })
+    user.request('GET /api/appointments/my', 'GET', '/api/appointments/my')
+
+
+def hospital_dashboard(user, data):
+    """Hospital staff logs in once, then reloads the dashboard"""
+    if not getattr(user, 'logged_in', False):
+        user.request('POST /api/hospital/login', 'POST', '/api/hospital/login',
+                     json={'email': user.rng.choice(data.hospital_emails), 'password': DEMO_PASSWORD})
+        user.logged_in = True
+    user.request('GET /api/hospital/appointments', 'GET', '/api/hospital/appointments')
+    user.request('GET /api/hospital/blood-stock', 'GET', '/api/hospital/blood-stock')
+    user.request('GET /api/hospital/doctors', 'GET', '/api/hospital/doctors')
+
+
+def admin_dashboard(user, data):
+    """Admin logs in once, then reloads the dashboard pages"""
+    if not getattr(user, 'logged_in', False):
+        user.request('POST /api/admin/login', 'POST', '/api/admin/login',
+                     json={'email': data.admin_email, 'password': DEMO_PASSWORD})
+        user.logged_in = True
+    user.request('GET /api/admin/dashboard-stats', 'GET', '/api/admin/dashboard-stats')
+    user.request('GET /api/admin/appointments', 'GET', '/api/admin/appointments')
+    user.request('GET /api/admin/users', 'GET', '/api/admin/users')
+    user.request('GET /api/admin/blood-stock', 'GET', '/api/admin/blood-stock')
+
+
+def anonymous_browsing(user, data):
+    """Visitor opens the home page and browses stock by location"""
+    user.request('GET /', 'GET', '/')
+    user.request('GET /api/counties', 'GET', '/api/counties')
+    user.request('GET /api/blood-types', 'GET', '/api/blood-types')
+    county, constituency = user.rng.choice(data.locations)
+    user.request('GET /api/blood-stock/<county>/<constituency>', 'GET', f'/api/blood-stock/{county}/{constituency}')
+    user.request('GET /api/blood-stock/<county>/all', 'GET', f'/api/blood-stock/{county}/all')
+
+
+SCENARIOS = {
+    'donor_journey': donor_journey,
+    'hospital_dashboard': hospital_dashboard,
+    'admin_dashboard': admin_dashboard,
+    'anonymous_browsing': anonymous_browsing
+}
+
+
+# ============================================
+# RUNNER
+# ============================================
+def run_scenario(name, data, concurrency, duration, seed):
+    """Run one scenario with `concurrency` virtual users for `duration` seconds"""
+    recorder = Recorder()
+    scenario = SCENARIOS[name]
+    stop_at = time.perf_counter() + duration
+    failures = []
+
+    def virtual_user(index):
+        user = VirtualUser(recorder, random.Random(seed + index))
+        while time.perf_counter() < stop_at:
+            try:
+                scenario(user, data)
+            except Exception as e:
+                failures.append(repr(e))
+                return
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=virtual_user, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = recorder.summary(time.perf_counter() - start)
+    summary['scenario_failures'] = failures[:10]
+    return summary
+
+
+def check_thresholds(results, thresholds):
+    """List every route metric that exceeds its threshold"""
+    violations = []
+    for scenario, summary in results.items():
+        for route, stats in summary['routes'].items():
+            limits = thresholds.get('routes', {}).get(route, thresholds.get('default', {}))
+            for metric, limit in limits.items():
+                if metric in stats and stats[metric] > limit:
+                    violations.append({'scenario': scenario, 'route': route, 'metric': metric,
+                                       'value': stats[metric], 'threshold': limit})
+            if stats['errors']:
+                violations.append({'scenario': scenario, 'route': route, 'metric': 'errors',
+                                   'value': stats['errors'], 'threshold': 0})
+    return violations
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=BENCH_DIR, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def print_report(results, baseline=None):
+    previous = (baseline or {}).get('scenarios', {})
+    for scenario, summary in results.items():
+        print(f"\n▶ {scenario}: {summary['requests']} requests, {summary['throughput_rps']} req/s, "
+              f"p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms")
+        print(f"  {'route':<46} {'reqs':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'calls':>6} {'Δp95':>8}")
+        for route, stats in summary['routes'].items():
+            before = previous.get(scenario, {}).get('routes', {}).get(route)
+            delta = f"{stats['p95_ms'] - before['p95_ms']:+.1f}" if before else ''
+            print(f"  {route:<46} {stats['requests']:>6} {stats['p50_ms']:>8} {stats['p95_ms']:>8} "
+                  f"{stats['p99_ms']:>8} {stats['upstream_calls_mean']:>6} {delta:>8}")
+        for failure in summary['scenario_failures']:
+            print(f"  ❌ {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scenario load tests against a local Supabase stand-in')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='repeatable; default all')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10, help='seconds per scenario')
+    parser.add_argument('--latency', type=float, default=0.03, help='simulated Supabase round trip (s)')
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--bcrypt-rounds', type=int, default=12, help='cost of the seeded password hashes')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--thresholds', default=THRESHOLDS_FILE)
+    parser.add_argument('--baseline', help='previous results JSON to compare p95 against')
+    parser.add_argument('--output', help='results JSON path')
+    args = parser.parse_args()
+
+    fake = FakePostgREST(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+    seed_demo_data(fake, donors=500, hospitals=30, appointments=3000, bcrypt_rounds=args.bcrypt_rounds, seed=args.seed)
+    uhai_app.get_http_session().mount(uhai_app.SUPABASE_URL, CountingAdapter(fake))
+    data = Dataset(fake)
+
+    results = {}
+    for name in args.scenario or list(SCENARIOS):
+        print(f"Running {name} ({args.concurrency} users, {args.duration}s)...")
+        results[name] = run_scenario(name, data, args.concurrency, args.duration, args.seed)
+
+    with open(args.thresholds) as f:
+        thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    violations = check_thresholds(results, thresholds)
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'git_commit': git_commit(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'scenarios': results,
+        'thresholds': thresholds,
+        'violations': violations
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print_report(results, baseline)
+    print(f"\n📄 Results: {output}")
+    for violation in violations:
+        print(f"⚠️  {violation['scenario']} {violation['route']}: {violation['metric']} "
+              f"{violation['value']} > {violation['threshold']}")
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+UHAI DAMU - Batched id loader
+Collects ids, fetches each batch in one upstream call and memoizes the rows.
+"""
+
+
+class BatchLoader:
+    """Dedupes and batches id lookups against a single table.
+
+    `batch_fn(ids)` receives a list of distinct string ids and must return a
+    dict mapping str(id) -> row. Ids it does not return are remembered as
+    missing, so nothing is fetched twice for the lifetime of the loader.
+
+    Typical use inside a handler:
+
+        users = get_loader('users')
+        users.prime(a['donor_id'] for a in appointments)
+        for a in appointments:
+            donor = users.load(a['donor_id'])   # first call fetches all primed ids
+    """
+
+    def __init__(self, batch_fn):
+        self.batch_fn = batch_fn
+        self.cache = {}
+        self.pending = {}
+        self.batches = 0
+
+    def prime(self, ids):
+        """Queue ids for the next fetch without fetching yet"""
+        for item_id in ids:
+            if not item_id:
+                continue
+            key = str(item_id)
+            if key not in self.cache and key not in self.pending:
+                self.pending[key] = True
+        return self
+
+    def dispatch(self):
+        """Fetch every queued id that is not cached yet in one batch"""
+        ids = [key for key in self.pending if key not in self.cache]
+        self.pending = {}
+        if not ids:
+            return
+
+        rows = self.batch_fn(ids) or {}
+        self.batches += 1
+        for key in ids:
+            self.cache[key] = rows.get(key)
+
+    def load(self, item_id):
+        """Return the row for one id (or None), fetching queued ids if needed"""
+        if not item_id:
+            return None
+        key = str(item_id)
+        if key not in self.cache:
+            self.prime([key])
+            self.dispatch()
+        return self.cache.get(key)
+
+    def load_many(self, ids):
+        """Return rows for several ids in order, using at most one fetch"""
+        ids = list(ids)
+        self.prime(ids)
+        self.dispatch()
+        return [self.cache.get(str(item_id)) if item_id else None for item_id in ids]
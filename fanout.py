@@ -0,0 +1,63 @@
+"""
+UHAI DAMU - Concurrent fan-out for independent upstream calls
+Runs a handful of blocking calls in parallel on a shared, bounded thread pool.
+"""
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+FANOUT_MAX_WORKERS = int(os.environ.get('UPSTREAM_FANOUT_WORKERS', 16))
+FANOUT_DEADLINE = float(os.environ.get('UPSTREAM_FANOUT_DEADLINE', 10))
+
+_executor = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix='upstream-fanout')
+
+
+class UpstreamError:
+    """Placeholder result for a call that raised or missed the deadline.
+
+    It is falsy, so handlers that already treat a failed supabase_request
+    (None) as "no data" keep working unchanged.
+    """
+
+    def __init__(self, reason, exception=None):
+        self.reason = reason
+        self.exception = exception
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return f"UpstreamError({self.reason!r})"
+
+
+def fan_out(calls, deadline=None):
+    """Run independent calls concurrently and return their results by name.
+
+    `calls` maps a name to a callable or a `(callable, *args)` tuple. The
+    whole batch shares one `deadline` in seconds; calls that have not
+    finished by then (or that raise) come back as UpstreamError markers
+    while the others are returned normally. Each call runs in a copy of
+    the caller's context, so flask.request / flask.g stay available.
+
+    Timed-out calls are not interrupted (threads cannot be killed); they
+    finish in the background bounded by their own HTTP timeout.
+    """
+    futures = {}
+    for name, call in calls.items():
+        fn, args = (call[0], call[1:]) if isinstance(call, tuple) else (call, ())
+        context = contextvars.copy_context()
+        futures[name] = _executor.submit(context.run, fn, *args)
+
+    done, _ = wait(futures.values(), timeout=FANOUT_DEADLINE if deadline is None else deadline)
+
+    results = {}
+    for name, future in futures.items():
+        if future not in done:
+            future.cancel()
+            results[name] = UpstreamError('timeout')
+        elif future.exception() is not None:
+            results[name] = UpstreamError('error', future.exception())
+        else:
+            results[name] = future.result()
+    return results
@@ -0,0 +1,37 @@
+"""
+UHAI DAMU - Gunicorn configuration
+Loaded automatically when gunicorn is started from the project root.
+
+For /metrics across workers, export PROMETHEUS_MULTIPROC_DIR (for example
+/tmp/uhai-metrics) before starting gunicorn, and METRICS_ALLOW or
+METRICS_TOKEN so the scraper is let in (see metrics.py).
+"""
+
+import os
+
+# Keep idle client connections open a little longer than the default
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+
+def post_worker_init(worker):
+    """Start the bcrypt helpers, then open the worker's Supabase keep-alive
+    connections and precompress the static files right after boot"""
+    import app as uhai_app
+    uhai_app.password_pool.start()
+    uhai_app.prewarm_supabase_pool()
+    uhai_app.prewarm_static_files()
+
+
+def on_starting(server):
+    """Start every run with an empty Prometheus multiprocess directory"""
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        import shutil
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Stop counting an exited worker's in-flight gauge"""
+    import metrics
+    metrics.mark_process_dead(worker.pid)
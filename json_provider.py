@@ -0,0 +1,83 @@
+"""
+UHAI DAMU - Fast JSON encoding and decoding
+orjson when it is installed, the standard library json module otherwise.
+Used for every jsonify() response and request.get_json() (through
+FastJSONProvider), and for Supabase request and response bodies.
+
+Responses look the same as with Flask's default provider: keys sorted,
+dates as HTTP dates, Decimal as a string. Output is UTF-8 rather than
+\\u-escaped, and anything orjson refuses (e.g. integers beyond 64 bits)
+is encoded by the standard library instead.
+
+Environment:
+    JSON_BACKEND   orjson (default when installed) or stdlib
+"""
+
+import json
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = os.environ.get('JSON_BACKEND') or ('orjson' if orjson is not None else 'stdlib')
+if orjson is None:
+    BACKEND = 'stdlib'
+
+if orjson is not None:
+    # datetime/date and dataclasses go to `default`, as with the stdlib encoder
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+def dumps_bytes(obj, sort_keys=False, default=None):
+    """Compact UTF-8 JSON"""
+    if BACKEND == 'orjson':
+        options = ORJSON_OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else ORJSON_OPTIONS
+        try:
+            return orjson.dumps(obj, default=default, option=options)
+        except TypeError:
+            pass
+    return json.dumps(
+        obj, default=default, sort_keys=sort_keys, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def dumps(obj, sort_keys=False, default=None):
+    return dumps_bytes(obj, sort_keys, default).decode('utf-8')
+
+
+def loads(data):
+    """Parse JSON from bytes or str; raises ValueError on bad input"""
+    if BACKEND == 'orjson':
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by dumps_bytes()/loads() above.
+
+    Install with `app.json = FastJSONProvider(app)`. Calls with extra
+    options (indent, cls, ...) are handed to Flask's default provider.
+    """
+
+    def dumps(self, obj, **kwargs):
+        sort_keys = kwargs.pop('sort_keys', self.sort_keys)
+        if kwargs:
+            return super().dumps(obj, sort_keys=sort_keys, **kwargs)
+        return dumps(obj, sort_keys, self.default)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        # Pretty-printed in debug mode, like the default provider
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = dumps_bytes(obj, self.sort_keys, self.default) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
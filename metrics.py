@@ -0,0 +1,152 @@
+"""
+UHAI DAMU - Prometheus metrics
+Request latency, in-flight requests, Supabase, bcrypt and Gemini timings,
+exposed in the Prometheus text format on /metrics.
+
+prometheus_client is optional: without it every metric is a no-op and
+/metrics answers 503.
+
+Multiple gunicorn workers: set PROMETHEUS_MULTIPROC_DIR to an empty,
+writable directory before the server starts. Each worker then writes its
+samples there and /metrics aggregates all of them (gunicorn.conf.py clears
+the directory at startup and cleans up after dead workers).
+
+/metrics is closed (404) unless a scraper is configured:
+    METRICS_TOKEN   scraper sends "Authorization: Bearer <token>"
+    METRICS_ALLOW   comma-separated client addresses or networks,
+                    e.g. "127.0.0.1,10.0.0.0/8"
+"""
+
+import hmac
+import ipaddress
+import os
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+    )
+    from prometheus_client import multiprocess
+except ImportError:
+    multiprocess = None
+    METRICS_ENABLED = False
+else:
+    METRICS_ENABLED = True
+
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR') or os.environ.get('prometheus_multiproc_dir')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOW = [ipaddress.ip_network(network.strip(), strict=False)
+                 for network in os.environ.get('METRICS_ALLOW', '').split(',') if network.strip()]
+
+# Seconds; tuned for a web API whose p95 target is well under a second
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BCRYPT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 5)
+
+
+class _NullMetric:
+    """Stand-in used when prometheus_client is not installed"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, amount):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+
+if METRICS_ENABLED:
+    REQUEST_LATENCY = Histogram(
+        'uhai_http_request_duration_seconds', 'Flask request latency',
+        ['route', 'method', 'status'], buckets=LATENCY_BUCKETS
+    )
+    # livesum: add up the gauges of the workers that are still alive
+    REQUESTS_IN_FLIGHT = Gauge(
+        'uhai_http_requests_in_flight', 'Requests currently being handled',
+        multiprocess_mode='livesum'
+    )
+    SUPABASE_LATENCY = Histogram(
+        'uhai_supabase_request_duration_seconds', 'Supabase HTTP call latency per attempt',
+        ['route', 'outcome'], buckets=LATENCY_BUCKETS
+    )
+    BCRYPT_DURATION = Histogram(
+        'uhai_bcrypt_duration_seconds', 'Time spent in bcrypt',
+        ['operation'], buckets=BCRYPT_BUCKETS
+    )
+    BCRYPT_WAIT = Histogram(
+        'uhai_bcrypt_queue_wait_seconds', 'Time a password job waited for a pool process',
+        buckets=BCRYPT_BUCKETS
+    )
+    BCRYPT_PENDING = Gauge(
+        'uhai_bcrypt_pending_jobs', 'Password jobs queued or running in the bcrypt pool',
+        multiprocess_mode='livesum'
+    )
+    BCRYPT_REJECTED = Counter(
+        'uhai_bcrypt_rejected_total', 'Password jobs refused because the bcrypt pool queue was full'
+    )
+    LOGIN_THROTTLED = Counter(
+        'uhai_login_throttled_total', 'Login attempts rejected by the rate limiter',
+        ['scope']
+    )
+    GEMINI_LATENCY = Histogram(
+        'uhai_gemini_request_duration_seconds', 'Gemini generate_content latency',
+        ['outcome'], buckets=LATENCY_BUCKETS
+    )
+    GEMINI_FALLBACKS = Counter(
+        'uhai_gemini_fallbacks_total', 'Chatbot answers served from the knowledge base instead of Gemini',
+        ['reason']
+    )
+else:
+    REQUEST_LATENCY = REQUESTS_IN_FLIGHT = SUPABASE_LATENCY = _NullMetric()
+    BCRYPT_DURATION = BCRYPT_WAIT = BCRYPT_PENDING = BCRYPT_REJECTED = _NullMetric()
+    LOGIN_THROTTLED = GEMINI_LATENCY = GEMINI_FALLBACKS = _NullMetric()
+
+
+def status_class(status_code):
+    """'2xx', '4xx', ... so the status label stays low-cardinality"""
+    return f'{status_code // 100}xx'
+
+
+def observe_request(route, method, status_code, seconds):
+    REQUEST_LATENCY.labels(route or 'unmatched', method, status_class(status_code)).observe(seconds)
+
+
+def observe_supabase(route, outcome, seconds):
+    SUPABASE_LATENCY.labels(route or 'background', outcome).observe(seconds)
+
+
+def observe_bcrypt(operation, seconds):
+    BCRYPT_DURATION.labels(operation).observe(seconds)
+
+
+def scrape_allowed(remote_addr, authorization):
+    """True if the client may read /metrics (see METRICS_TOKEN / METRICS_ALLOW)"""
+    if METRICS_TOKEN and hmac.compare_digest((authorization or '').encode(), f'Bearer {METRICS_TOKEN}'.encode()):
+        return True
+    try:
+        address = ipaddress.ip_address(remote_addr or '')
+    except ValueError:
+        return False
+    return any(address in network for network in METRICS_ALLOW)
+
+
+def render():
+    """Return (body, content_type) for a /metrics response"""
+    if not METRICS_ENABLED:
+        return b'# prometheus_client is not installed\n', 'text/plain; charset=utf-8'
+
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """Drop a dead worker's live gauges (call from gunicorn's child_exit)"""
+    if METRICS_ENABLED and MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,300 @@
+"""
+UHAI DAMU - HTML page assembly and minification
+Pages pull shared markup from partials/ with an include comment:
+
+    <!-- include: nav.html -->
+
+Links inside a partial that point at the including page are marked with
+class="active" and aria-current="page".
+
+After assembly the page is minified: comments go, whitespace between tags
+and inside inline <style>/<script> blocks is collapsed, and CSS/JS
+comments are removed. The minifiers never rewrite tokens, so string,
+template and regex literals, <pre> and <textarea> content come out
+unchanged; a line break in whitespace is kept as a line break so JS
+automatic semicolon insertion still sees it.
+"""
+
+import os
+import re
+
+PARTIALS_DIR = 'partials'
+
+INCLUDE = re.compile(r'<!--\s*include:\s*([\w.-]+)\s*-->')
+# Tags, with quoted attribute values that may contain '>'
+TAG = re.compile(r'''<(?:[^>"']|"[^"]*"|'[^']*')*>''')
+COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.S)
+RAW_TEXT = re.compile(r'(<(script|style|pre|textarea)\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>)(.*?)(</\2\s*>)', re.S | re.I)
+SCRIPT_TYPE = re.compile(r'''\btype\s*=\s*["']?([^"'\s>]+)''', re.I)
+JS_TYPES = ('text/javascript', 'application/javascript', 'module')
+WHITESPACE = re.compile(r'\s+')
+
+# Characters next to which JS whitespace carries no meaning ('+', '-', '/'
+# and '.' are left out: "a + +b", "a / /re/" and "1 .toString()")
+JS_PUNCTUATION = set('{}()[];,:=<>*%&|!?~^')
+# A '/' after these starts a regex literal, not a division
+JS_REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new',
+                     'delete', 'void', 'throw', 'instanceof', 'yield', 'await')
+CSS_PUNCTUATION = set('{};,>')
+
+
+class PageError(Exception):
+    """A page or partial could not be assembled"""
+
+
+# ============================================
+# ASSEMBLY
+# ============================================
+def assemble(path, root):
+    """Return (html, partial_paths) with every include comment replaced"""
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+
+    page = os.path.basename(path)
+    partials = []
+
+    def include(match):
+        partial = os.path.join(root, PARTIALS_DIR, match.group(1))
+        if not os.path.isfile(partial):
+            raise PageError(f'{page}: missing partial {match.group(1)}')
+        partials.append(partial)
+        with open(partial, encoding='utf-8') as f:
+            return mark_current_page(f.read().rstrip('\n'), page)
+
+    return INCLUDE.sub(include, html), partials
+
+
+def mark_current_page(html, page):
+    return html.replace(f'<a href="{page}"', f'<a href="{page}" class="active" aria-current="page"')
+
+
+# ============================================
+# MINIFICATION
+# ============================================
+def minify_html(html):
+    """Minified page; raw-text elements are passed to the CSS/JS minifiers or kept"""
+    parts = []
+    position = 0
+    for match in RAW_TEXT.finditer(html):
+        parts.append(_minify_markup(html[position:match.start()]))
+        open_tag, name, body, close_tag = match.group(1), match.group(2).lower(), match.group(3), match.group(4)
+        if name == 'style':
+            body = minify_css(body)
+        elif name == 'script' and 'src=' not in open_tag.lower():
+            script_type = SCRIPT_TYPE.search(open_tag)
+            if script_type is None or script_type.group(1).lower() in JS_TYPES:
+                body = minify_js(body)
+        parts.append(_collapse_tag(open_tag) + body + close_tag)
+        position = match.end()
+    parts.append(_minify_markup(html[position:]))
+    return ''.join(parts).strip() + '\n'
+
+
+def _minify_markup(html):
+    html = COMMENT.sub('', html)
+    parts = []
+    position = 0
+    for match in TAG.finditer(html):
+        parts.append(_collapse_text(html[position:match.start()]))
+        parts.append(_collapse_tag(match.group(0)))
+        position = match.end()
+    parts.append(_collapse_text(html[position:]))
+    return ''.join(parts)
+
+
+def _collapse_text(text):
+    # Browsers render any whitespace run between words/tags as one space
+    return WHITESPACE.sub(lambda m: '\n' if '\n' in m.group(0) else ' ', text)
+
+
+def _collapse_tag(tag):
+    # Only whitespace between attributes; quoted values are kept as written
+    parts = re.split(r'''("[^"]*"|'[^']*')''', tag)
+    for i in range(0, len(parts), 2):
+        parts[i] = WHITESPACE.sub(' ', parts[i]).replace(' >', '>')
+    return ''.join(parts)
+
+
+def _copy_string(source, i, quote):
+    """Index just past the string literal starting at source[i]"""
+    i += 1
+    while i < len(source) and source[i] != quote:
+        i += 2 if source[i] == '\\' else 1
+    return i + 1
+
+
+def minify_css(source):
+    out = []
+    i = 0
+    pending_space = False
+    while i < len(source):
+        c = source[i]
+        if c in '"\'':
+            end = _copy_string(source, i, c)
+            token = source[i:end]
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = len(source) if end < 0 else end + 2
+            pending_space = True
+            continue
+        elif c.isspace():
+            pending_space = True
+            i += 1
+            continue
+        else:
+            token = c
+            i += 1
+
+        if pending_space and out and out[-1][-1] not in CSS_PUNCTUATION and out[-1][-1] != ':' \
+                and token[0] not in CSS_PUNCTUATION:
+            out.append(' ')
+        pending_space = False
+        if token == '}' and out and out[-1] == ';':
+            out.pop()
+        out.append(token)
+    return ''.join(out)
+
+
+def minify_js(source):
+    out = []
+    _minify_js_code(source, 0, out, in_template=False)
+    return ''.join(out).strip()
+
+
+def _last_char(out):
+    for token in reversed(out):
+        if token:
+            return token[-1]
+    return ''
+
+
+def _regex_allowed(out):
+    """Whether a '/' here starts a regex literal"""
+    last = _last_char(out)
+    if not last or last in JS_REGEX_PREFIX or last == '\n':
+        return True
+    if last.isalnum() or last in '_$':
+        tail = re.search(r'[\w$]+$', ''.join(out[-8:]))
+        return tail is not None and tail.group(0) in JS_REGEX_KEYWORDS
+    return False
+
+
+def _minify_js_code(source, i, out, in_template):
+    """Minify from source[i]; inside a template's ${...} stop at the closing
+    brace. Returns the index reached."""
+    depth = 0
+    whitespace = None
+    n = len(source)
+    while i < n:
+        c = source[i]
+
+        if c.isspace() or source.startswith('//', i) or source.startswith('/*', i):
+            # Whitespace and comments collapse into one separator
+            start = i
+            newline = False
+            while i < n:
+                if source[i].isspace():
+                    newline = newline or source[i] == '\n'
+                    i += 1
+                elif source.startswith('//', i):
+                    end = source.find('\n', i)
+                    i = n if end < 0 else end
+                elif source.startswith('/*', i):
+                    end = source.find('*/', i + 2)
+                    end = n if end < 0 else end + 2
+                    newline = newline or '\n' in source[i:end]
+                    i = end
+                else:
+                    break
+            whitespace = '\n' if newline else ' '
+            if start == 0 and not out:
+                whitespace = None
+            continue
+
+        if whitespace is not None:
+            prev = _last_char(out)
+            if whitespace == '\n':
+                if prev and prev not in '{;,' and c != '}':
+                    out.append('\n')
+            elif prev and prev not in JS_PUNCTUATION and c not in JS_PUNCTUATION:
+                out.append(' ')
+            whitespace = None
+
+        if c in '"\'':
+            end = _copy_string(source, i, c)
+            out.append(source[i:end])
+            i = end
+        elif c == '`':
+            i = _copy_template(source, i, out)
+        elif c == '/' and _regex_allowed(out):
+            i = _copy_regex(source, i, out)
+        elif c == '{':
+            depth += 1
+            out.append(c)
+            i += 1
+        elif c == '}':
+            if in_template and depth == 0:
+                return i
+            depth -= 1
+            out.append(c)
+            i += 1
+        else:
+            out.append(c)
+            i += 1
+    return i
+
+
+def _copy_template(source, i, out):
+    start = i
+    i += 1
+    while i < len(source):
+        c = source[i]
+        if c == '\\':
+            i += 2
+        elif c == '`':
+            out.append(source[start:i + 1])
+            return i + 1
+        elif source.startswith('${', i):
+            out.append(source[start:i + 2])
+            i = _minify_js_code(source, i + 2, out, in_template=True)
+            start = i
+            i += 1
+        else:
+            i += 1
+    out.append(source[start:])
+    return i
+
+
+def _copy_regex(source, i, out):
+    start = i
+    i += 1
+    in_class = False
+    while i < len(source):
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '\n':
+            break
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            while i < len(source) and (source[i].isalnum() or source[i] == '_'):
+                i += 1
+            break
+        i += 1
+    out.append(source[start:i])
+    return i
+
+
+def build_page(path, root, minify=True):
+    """Assembled (and minified) page as UTF-8 bytes, plus the partials it used"""
+    html, partials = assemble(path, root)
+    if minify:
+        html = minify_html(html)
+    return html.encode('utf-8'), partials
@@ -0,0 +1,216 @@
+"""
+UHAI DAMU - Bounded bcrypt process pool
+bcrypt costs ~250 ms of CPU per hash at cost 12. Running it in the web
+worker lets a burst of logins starve every other request on that worker,
+so password work goes to a small pool of helper processes instead.
+
+At most BCRYPT_MAX_PENDING jobs may be queued or running per worker;
+beyond that PasswordPoolBusy is raised and the caller should answer 503
+rather than let logins pile up behind each other.
+
+Environment:
+    BCRYPT_ROUNDS         12  cost for new hashes; older hashes are upgraded on login
+    BCRYPT_POOL_WORKERS   2   helper processes per web worker (0 = hash inline)
+    BCRYPT_MAX_PENDING    32  queued + running jobs before PasswordPoolBusy
+    BCRYPT_WAIT_TIMEOUT   10  seconds a caller waits for its result (then PasswordPoolBusy)
+    BCRYPT_START_METHOD   fork where available, else spawn
+
+Helpers are forked from the web worker; gunicorn.conf.py starts them in
+post_worker_init, before the first request. structured_log's listener
+thread is already running by then (it starts when app.py is imported), so
+a helper may inherit a logging lock in a locked state. Helpers only run
+bcrypt and never log, so that lock is never taken in them.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+import metrics
+
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+BCRYPT_POOL_WORKERS = int(os.environ.get('BCRYPT_POOL_WORKERS', 2))
+BCRYPT_MAX_PENDING = int(os.environ.get('BCRYPT_MAX_PENDING', 32))
+BCRYPT_WAIT_TIMEOUT = float(os.environ.get('BCRYPT_WAIT_TIMEOUT', 10))
+# spawn/forkserver re-import the __main__ module in every helper, which
+# breaks scripts without a __main__ guard, so fork is preferred
+BCRYPT_START_METHOD = os.environ.get('BCRYPT_START_METHOD') or (
+    'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+
+class PasswordPoolBusy(Exception):
+    """Too many password jobs are already queued in this worker"""
+
+
+# ============================================
+# WORK FUNCTIONS (run in the helper processes)
+# ============================================
+def _hash(password, rounds):
+    started = time.perf_counter()
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+    return hashed, time.perf_counter() - started
+
+
+def _verify(password, password_hash):
+    started = time.perf_counter()
+    ok = bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    return ok, time.perf_counter() - started
+
+
+def _noop():
+    return None
+
+
+def hash_rounds(password_hash):
+    """Cost factor of a '$2b$12$...' hash, or None if it is not bcrypt"""
+    parts = (password_hash or '').split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(password_hash):
+    return hash_rounds(password_hash) != BCRYPT_ROUNDS
+
+
+# ============================================
+# POOL
+# ============================================
+class PasswordPool:
+    """Per-process executor with a hard cap on outstanding jobs"""
+
+    def __init__(self, workers=BCRYPT_POOL_WORKERS, max_pending=BCRYPT_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Not inherited across fork: each gunicorn worker starts its own helpers
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context(BCRYPT_START_METHOD)
+            )
+            self._pid = os.getpid()
+        return self._executor
+
+    def start(self):
+        """Start every helper process now instead of on the first login"""
+        if self.workers <= 0:
+            return
+        with self._lock:
+            executor = self._get_executor()
+        for future in [executor.submit(_noop) for _ in range(self.workers)]:
+            future.result()
+
+    def submit(self, fn, *args):
+        """Queue fn(*args) in a helper process; raises PasswordPoolBusy when full"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                metrics.BCRYPT_REJECTED.inc()
+                raise PasswordPoolBusy('Password service is busy')
+            self.pending += 1
+            executor = self._get_executor()
+        metrics.BCRYPT_PENDING.inc()
+        
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException as e:
+            self._release(None)
+            if isinstance(e, BrokenProcessPool):
+                self._discard(executor)
+            raise
+        future.executor = executor
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+        metrics.BCRYPT_PENDING.dec()
+
+    def _discard(self, executor):
+        """Drop a pool whose helper died (e.g. OOM-killed); the next job starts a new one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def run(self, operation, fn, *args):
+        """Run a work function and record its CPU time and queue wait.
+
+        Raises PasswordPoolBusy when the pool is full or the result takes
+        longer than BCRYPT_WAIT_TIMEOUT.
+        """
+        started = time.perf_counter()
+        if self.workers <= 0:
+            result, work_seconds = fn(*args)
+        else:
+            future = self.submit(fn, *args)
+            try:
+                result, work_seconds = future.result(timeout=BCRYPT_WAIT_TIMEOUT)
+            except FutureTimeout:
+                # Still queued behind other jobs: drop it so it frees its slot
+                future.cancel()
+                raise PasswordPoolBusy('Password service timed out') from None
+            except BrokenProcessPool:
+                self._discard(future.executor)
+                raise
+        metrics.observe_bcrypt(operation, work_seconds)
+        metrics.BCRYPT_WAIT.observe(max(time.perf_counter() - started - work_seconds, 0))
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'rounds': BCRYPT_ROUNDS,
+                'pending': self.pending,
+                'max_pending': self.max_pending,
+                'rejected': self.rejected
+            }
+
+
+password_pool = PasswordPool()
+
+
+def hash_password(password):
+    """bcrypt hash at BCRYPT_ROUNDS"""
+    return password_pool.run('hash', _hash, password, BCRYPT_ROUNDS)
+
+
+def verify_password(password, password_hash):
+    """True if password matches the stored bcrypt hash"""
+    return password_pool.run('verify', _verify, password, password_hash)
+
+
+def rehash_later(password, on_done):
+    """Hash password at the current cost in the background and pass the hash
+    to on_done(new_hash) on a new thread. Skipped silently when the pool is busy."""
+    if password_pool.workers <= 0:
+        threading.Thread(target=lambda: on_done(_hash(password, BCRYPT_ROUNDS)[0]), daemon=True).start()
+        return
+    try:
+        future = password_pool.submit(_hash, password, BCRYPT_ROUNDS)
+    except (PasswordPoolBusy, BrokenProcessPool):
+        return
+
+    def finished(done):
+        # Runs on the executor's manager thread, which also delivers every
+        # other bcrypt result: on_done (a Supabase write) must not run here
+        if done.exception() is None:
+            new_hash, work_seconds = done.result()
+            metrics.observe_bcrypt('rehash', work_seconds)
+            threading.Thread(target=on_done, args=(new_hash,), name='password-rehash', daemon=True).start()
+
+    future.add_done_callback(finished)
@@ -0,0 +1,139 @@
+"""
+UHAI DAMU - Token-bucket rate limiting
+Used to throttle login attempts by client IP and by account email before
+any database lookup or bcrypt work happens.
+
+A bucket holds up to `capacity` tokens and refills at `per_second`. Each
+attempt takes a token; an empty bucket means "retry after N seconds". A
+negative cost puts tokens back.
+
+Backends (all share the take() signature):
+    MemoryBucketStore  per-process; limits are per gunicorn worker
+    SQLiteBucketStore  one SQLite file shared by every worker on the host
+Anything else with the same take() method (e.g. a Redis script) can be
+passed to LoginThrottle.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBucketStore:
+    """Buckets in a bounded dict; least recently used keys are evicted first"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, per_second, cost=1):
+        """Take `cost` tokens. Returns (allowed, retry_after_seconds).
+
+        A negative cost is a refund: it always succeeds and never fills the
+        bucket past `capacity`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * per_second)
+            allowed = cost <= 0 or tokens >= cost
+            if allowed:
+                tokens = min(capacity, tokens - cost)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0 if allowed else retry_after(tokens, cost, per_second)
+
+
+class SQLiteBucketStore:
+    """Buckets in a SQLite file, so every worker process sees the same counts.
+
+    Each take() is one short write transaction; WAL mode keeps readers and
+    the single writer from blocking each other for long.
+    """
+
+    def __init__(self, path, busy_timeout=2.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+
+    def _connect(self):
+        db = getattr(self._local, 'db', None)
+        if db is None or getattr(self._local, 'pid', None) != os.getpid():
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def take(self, key, capacity, per_second, cost=1):
+        # Wall clock, since monotonic clocks are not comparable across processes
+        now = time.time()
+        db = self._connect()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            row = db.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(now - updated, 0) * per_second)
+            allowed = cost <= 0 or tokens >= cost
+            if allowed:
+                tokens = min(capacity, tokens - cost)
+            db.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)', (key, tokens, now))
+            db.execute('COMMIT')
+        except Exception:
+            db.execute('ROLLBACK')
+            raise
+        return allowed, 0 if allowed else retry_after(tokens, cost, per_second)
+
+    def prune(self, older_than=3600):
+        """Delete buckets untouched for `older_than` seconds (they are full again anyway)"""
+        self._connect().execute('DELETE FROM buckets WHERE updated < ?', (time.time() - older_than,))
+
+
+def retry_after(tokens, cost, per_second):
+    """Whole seconds until the bucket can pay for the next attempt"""
+    return max(1, math.ceil((max(cost, 1) - tokens) / per_second))
+
+
+class LoginThrottle:
+    """Per-IP and per-email login limits.
+
+    Every attempt spends a token from the client IP's bucket and reserves
+    one from the email's bucket before the password is checked, so parallel
+    guesses cannot all pass on the same token. The email token is handed
+    back unless the password turned out to be wrong: a flood of bad guesses
+    locks the account for a while, but the owner's successful logins never
+    count against it.
+    """
+
+    def __init__(self, store, ip_capacity=20, ip_per_minute=10, email_capacity=5, email_per_minute=1):
+        self.store = store
+        self.ip_limit = (ip_capacity, ip_per_minute / 60)
+        self.email_limit = (email_capacity, email_per_minute / 60)
+
+    def check(self, ip, email):
+        """Return (allowed, retry_after, scope) for a new attempt"""
+        allowed, wait = self.store.take(f'login:ip:{ip}', *self.ip_limit)
+        if not allowed:
+            return False, wait, 'ip'
+        if email:
+            allowed, wait = self.store.take(email_key(email), *self.email_limit)
+            if not allowed:
+                return False, wait, 'email'
+        return True, 0, None
+
+    def refund(self, email):
+        """Give back the email token reserved by check()"""
+        if email:
+            self.store.take(email_key(email), *self.email_limit, cost=-1)
+
+
+def email_key(email):
+    return f'login:email:{email.strip().lower()}'
@@ -0,0 +1,160 @@
+"""
+UHAI DAMU - Upstream resilience helpers
+Circuit breaker, retry policy and idempotency key store for Supabase calls.
+"""
+
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from structured_log import get_logger
+
+log = get_logger('resilience')
+
+
+class CircuitBreaker:
+    """Fail fast once an upstream keeps failing.
+
+    closed    - calls go through; consecutive failures are counted
+    open      - calls are refused until `reset_timeout` seconds have passed
+    half_open - one trial call is let through; success closes the breaker,
+                failure opens it again
+
+    allow() returns a permit (True, or TRIAL for the half-open trial call).
+    Callers pass it to release() when the call ends, on every exit path, so
+    a trial that ended without record_success()/record_failure() (skipped,
+    cancelled, unexpected error) frees the slot for the next call.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    TRIAL = 'trial'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return a permit (truthy) if a call may be attempted now, else False"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return self.TRIAL
+            self.rejected += 1
+            return False
+
+    def release(self, permit):
+        """End a call allowed by allow(); frees an unsettled half-open trial"""
+        if permit != self.TRIAL:
+            return
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    log.warning('Circuit breaker opened after %d failures', self.failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures, 'rejected': self.rejected}
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter.
+
+    Attempt n (0-based) waits a random time in [0, min(max_delay, base_delay * 2**n)],
+    which spreads retries from many workers instead of synchronising them.
+    """
+
+    def __init__(self, attempts=3, base_delay=0.1, max_delay=1.0):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class IdempotencyStore:
+    """Bounded, expiring record of write requests keyed by Idempotency-Key.
+
+    begin() claims a key and returns (state, value):
+        ('new', None)          - first time; run the handler, then complete()
+        ('done', response)     - already finished; replay the stored response
+        ('in_progress', None)  - a request with this key is still running
+        ('mismatch', None)     - key reused with a different request body
+        ('full', None)         - every slot holds a running request; try later
+
+    When the store is full, the oldest completed or expired entry makes room.
+    Running requests are never evicted, or a retry of one could run twice.
+    """
+
+    def __init__(self, ttl=86400, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, key, fingerprint):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['expires_at'] < now:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                while len(self._entries) >= self.max_entries:
+                    victim = next((k for k, e in self._entries.items()
+                                   if e['state'] == 'done' or e['expires_at'] < now), None)
+                    if victim is None:
+                        return 'full', None
+                    del self._entries[victim]
+                self._entries[key] = {'state': 'in_progress', 'fingerprint': fingerprint,
+                                      'response': None, 'expires_at': now + self.ttl}
+                return 'new', None
+
+            if entry['fingerprint'] != fingerprint:
+                return 'mismatch', None
+            if entry['state'] == 'done':
+                return 'done', entry['response']
+            return 'in_progress', None
+
+    def complete(self, key, response):
+        """Store the final response for a key claimed with begin()"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['state'] = 'done'
+                entry['response'] = response
+
+    def abandon(self, key):
+        """Release a key whose request failed so the client may retry it"""
+        with self._lock:
+            self._entries.pop(key, None)
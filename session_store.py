@@ -0,0 +1,181 @@
+"""
+UHAI DAMU - Server-side sessions
+The browser cookie only carries a random session id; the identity payload
+(user_id, user_type, user_name, user_email, hospital_name) lives in a store
+on the server and is looked up by id on each request.
+
+Stores (all share get/set/delete):
+    MemorySessionStore  LRU dict in the worker; only for a single worker process
+    SQLiteSessionStore  SQLite file shared by every worker on the host
+    CacheSessionStore   any shared cache client with get/set/delete
+                        (memcached, Redis, ...), values stored as JSON
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+
+class MemorySessionStore:
+    """Bounded in-process store; the least recently used session goes first"""
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self._entries[sid]
+                return None
+            self._entries.move_to_end(sid)
+            return dict(entry[0])
+
+    def set(self, sid, data, ttl):
+        with self._lock:
+            self._entries[sid] = (dict(data), time.time() + ttl)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._entries.pop(sid, None)
+
+
+class SQLiteSessionStore:
+    """Sessions keyed by id in a SQLite file (primary-key lookups, WAL mode)"""
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path, busy_timeout=2.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, data TEXT, expires REAL)')
+
+    def _connect(self):
+        db = getattr(self._local, 'db', None)
+        if db is None or getattr(self._local, 'pid', None) != os.getpid():
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def get(self, sid):
+        row = self._connect().execute(
+            'SELECT data FROM sessions WHERE sid = ? AND expires > ?', (sid, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, sid, data, ttl):
+        db = self._connect()
+        db.execute('INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)',
+                   (sid, json.dumps(data), time.time() + ttl))
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            db.execute('DELETE FROM sessions WHERE expires <= ?', (time.time(),))
+
+    def delete(self, sid):
+        self._connect().execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+
+class CacheSessionStore:
+    """Adapter for a shared cache client.
+
+    The client needs get(key), set(key, value, ttl) and delete(key); wrap
+    redis/pymemcache clients in a small adapter if their signatures differ.
+    """
+
+    def __init__(self, client, prefix='uhai:session:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, sid):
+        value = self.client.get(self.prefix + sid)
+        return json.loads(value) if value else None
+
+    def set(self, sid, data, ttl):
+        self.client.set(self.prefix + sid, json.dumps(data), int(ttl))
+
+    def delete(self, sid):
+        self.client.delete(self.prefix + sid)
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.loaded_user = (initial or {}).get('user_id')
+
+
+class ServerSessionInterface(SessionInterface):
+    """Flask session interface backed by one of the stores above.
+
+    The store is only written when the session changes. A new session id is
+    issued whenever the logged-in user changes, so an id handed out before
+    login is never reused afterwards.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.store.get(sid)
+            if data is not None:
+                return ServerSideSession(data, sid=sid)
+        return ServerSideSession(new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and session.sid:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if not session.modified:
+            return
+
+        if session.sid is None or session.get('user_id') != session.loaded_user:
+            if session.sid:
+                self.store.delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+
+        ttl = app.permanent_session_lifetime.total_seconds()
+        self.store.set(session.sid, dict(session), ttl)
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
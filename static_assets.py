@@ -0,0 +1,361 @@
+"""
+UHAI DAMU - Precompressed static files
+Pages, CSS and JS are read once, compressed with gzip (and brotli when the
+`brotli` package is installed) and kept in a bounded in-memory cache. Each
+request then only picks the smallest encoding the client accepts.
+
+HTML pages are assembled from the shared partials/ and minified first
+(see page_builder.py).
+
+With reload=True (development) a cached file is re-read when its mtime or
+size, or that of a partial it includes, changes on disk, so edits show up
+without a restart. With reload=False (production) a file is read once and
+then served from memory without touching the disk.
+
+Fingerprinting: the shared stylesheet and scripts (FINGERPRINTED_ASSETS)
+are also served as e.g. js/main.<hash>.js, where <hash> comes from the
+file's content, and HTML pages reference them by that name. Those URLs
+never change meaning, so browsers may cache them for a year; a deploy
+that edits an asset changes its hash and the pages that point to it.
+
+Precompress everything ahead of time (e.g. during a deploy) with:
+    python static_assets.py
+or write the built tree (rewritten pages, fingerprinted copies and .gz/.br
+files next to each file) for a CDN or nginx with:
+    python static_assets.py --out build/
+The build finishes by writing BUILD_MARKER into the tree; is_built_tree()
+checks for it.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+
+import page_builder
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Extensions served at all; anything else under the project root is private
+ALLOWED_EXTENSIONS = ('.html', '.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.ico', '.json', '.txt', '.svg')
+# Already-compressed formats are served as they are
+COMPRESSIBLE_EXTENSIONS = ('.html', '.css', '.js', '.json', '.txt', '.svg')
+
+CACHE_CONTROL = {
+    '.html': 'no-cache',
+    '.css': 'public, max-age=3600',
+    '.js': 'public, max-age=3600'
+}
+DEFAULT_CACHE_CONTROL = 'public, max-age=86400'
+
+FINGERPRINTED_ASSETS = ('css/styles.css', 'js/api.js', 'js/main.js', 'js/chatbot.js', 'js/simple-chatbot.js')
+FINGERPRINT_LENGTH = 12
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# src="js/main.js", href='/css/styles.css', ...
+# (bytes, so pages in other encodings such as UTF-16 are left as they are)
+ASSET_REFERENCE = re.compile(
+    rb'((?:src|href)=["\'](?:\./|/)?)(' + b'|'.join(re.escape(name.encode()) for name in FINGERPRINTED_ASSETS) + rb')(?=["\'])'
+)
+# Written last by build(), so a tree that has it is complete
+BUILD_MARKER = '.static-build'
+FINGERPRINTED_NAME = re.compile(r'^(.+)\.([0-9a-f]{%d})(\.[a-z]+)$' % FINGERPRINT_LENGTH)
+
+
+def content_type_for(path):
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if content_type.startswith('text/') or path.endswith(('.js', '.json', '.svg')):
+        content_type += '; charset=utf-8'
+    return content_type
+
+
+def is_built_tree(path):
+    """True if path is an output directory of build() (`--out`)"""
+    return bool(path) and os.path.isfile(os.path.join(path, BUILD_MARKER))
+
+
+def cache_control_for(path):
+    return CACHE_CONTROL.get(os.path.splitext(path)[1].lower(), DEFAULT_CACHE_CONTROL)
+
+
+def fingerprinted_name(name, fingerprint):
+    """'js/main.js' -> 'js/main.<fingerprint>.js'"""
+    base, ext = os.path.splitext(name)
+    return f'{base}.{fingerprint}{ext}'
+
+
+def split_fingerprint(filename):
+    """'js/main.<fingerprint>.js' -> ('js/main.js', fingerprint); anything else -> (filename, None)"""
+    match = FINGERPRINTED_NAME.match(filename)
+    if match:
+        name = match.group(1) + match.group(3)
+        if name in FINGERPRINTED_ASSETS:
+            return name, match.group(2)
+    return filename, None
+
+
+class StaticFile:
+    """One file with its encoded variants: {'identity': bytes, 'gzip': ..., 'br': ...}"""
+
+    __slots__ = ('path', 'mtime', 'size', 'content_type', 'etag', 'cache_control', 'variants', 'nbytes',
+                 'assets', 'partials')
+
+    def __init__(self, path, stat, data, gzip_level=9, brotli_quality=11, assets=(), partials=()):
+        ext = os.path.splitext(path)[1].lower()
+        self.path = path
+        # (name, fingerprint) of every asset this page was rewritten to point at
+        self.assets = assets
+        # (path, mtime_ns) of every partial included in this page
+        self.partials = partials
+        self.mtime = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.content_type = content_type_for(path)
+        self.etag = hashlib.sha256(data).hexdigest()[:32]
+        self.cache_control = cache_control_for(path)
+        self.variants = {'identity': data}
+
+        if ext in COMPRESSIBLE_EXTENSIONS and len(data) > 256:
+            # mtime=0 keeps the gzip bytes identical across workers and restarts
+            compressed = gzip.compress(data, compresslevel=gzip_level, mtime=0)
+            if len(compressed) < len(data):
+                self.variants['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=brotli_quality)
+                if len(compressed) < len(data):
+                    self.variants['br'] = compressed
+        self.nbytes = sum(len(body) for body in self.variants.values())
+
+    def select(self, accept_encoding):
+        """(encoding, body) for the smallest variant the client accepts"""
+        accepted = parse_accept_encoding(accept_encoding)
+        best = 'identity'
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accepted.get(encoding, accepted.get('*', 0)) > 0:
+                if len(self.variants[encoding]) < len(self.variants[best]):
+                    best = encoding
+        return best, self.variants[best]
+
+    def etag_for(self, encoding):
+        """Strong ETags must differ between encodings of the same file"""
+        return self.etag if encoding == 'identity' else f'{self.etag}-{encoding}'
+
+
+def parse_accept_encoding(header):
+    """{'gzip': 1.0, 'br': 0.8, ...} from an Accept-Encoding header"""
+    accepted = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+class StaticFileCache:
+    """Bounded LRU of StaticFile entries (limit on total bytes held)"""
+
+    def __init__(self, root, max_bytes=32 * 1024 * 1024, max_file_size=2 * 1024 * 1024,
+                 gzip_level=9, brotli_quality=11, minify=True, reload=True):
+        self.root = os.path.realpath(root)
+        self.max_bytes = max_bytes
+        self.max_file_size = max_file_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.minify = minify
+        self.reload = reload
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Requested name -> cached path, so reload=False skips the filesystem
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, filename):
+        """Absolute path for a public file, or None if it is not servable"""
+        if not filename.lower().endswith(ALLOWED_EXTENSIONS):
+            return None
+        path = os.path.realpath(os.path.join(self.root, filename))
+        if not path.startswith(self.root + os.sep) or not os.path.isfile(path):
+            return None
+        # Hidden files and directories (.git, .env ...) and partials are never public
+        parts = os.path.relpath(path, self.root).split(os.sep)
+        if any(part.startswith('.') for part in parts) or parts[0] == page_builder.PARTIALS_DIR:
+            return None
+        return path
+
+    def get(self, filename):
+        """StaticFile for filename, or None if missing, not allowed or too large to cache"""
+        if not self.reload:
+            with self._lock:
+                entry = self._entries.get(self._names.get(filename))
+                if entry is not None:
+                    self._entries.move_to_end(entry.path)
+                    self.hits += 1
+                    return entry
+
+        path = self.resolve(filename)
+        if path is None:
+            return None
+        stat = os.stat(path)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.mtime == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._entries.move_to_end(path)
+            else:
+                entry = None
+        # A page is stale too once a partial or an asset it points to has changed
+        if entry is not None and self._dependencies_current(entry):
+            self.hits += 1
+            return entry
+        self.misses += 1
+
+        if stat.st_size > self.max_file_size:
+            return None
+        data, partials = self._load(path)
+        assets = ()
+        if path.endswith('.html'):
+            data, assets = self.rewrite_references(data)
+        entry = StaticFile(path, stat, data, self.gzip_level, self.brotli_quality, assets, partials)
+        self._store(entry)
+        with self._lock:
+            self._names[filename] = path
+        return entry
+
+    def _load(self, path):
+        """File content, with pages assembled and minified; also returns the partials used"""
+        if path.endswith('.html'):
+            try:
+                data, partials = page_builder.build_page(path, self.root, self.minify)
+            except UnicodeDecodeError:
+                # Not UTF-8 (e.g. a UTF-16 test page): served exactly as stored
+                pass
+            else:
+                return data, tuple((partial, os.stat(partial).st_mtime_ns) for partial in partials)
+        with open(path, 'rb') as f:
+            return f.read(), ()
+
+    def _dependencies_current(self, entry):
+        for partial, mtime in entry.partials:
+            try:
+                if os.stat(partial).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return all(self.fingerprint(name) == fp for name, fp in entry.assets)
+
+    def fingerprint(self, name):
+        """Content hash used in the fingerprinted URL of an asset, or None"""
+        entry = self.get(name)
+        return entry.etag[:FINGERPRINT_LENGTH] if entry is not None else None
+
+    def rewrite_references(self, data):
+        """Point a page's asset references at their fingerprinted names.
+
+        Returns (data, ((name, fingerprint), ...)).
+        """
+        fingerprints = {}
+
+        def replace(match):
+            name = match.group(2).decode()
+            if name not in fingerprints:
+                fingerprints[name] = self.fingerprint(name)
+            if fingerprints[name] is None:
+                return match.group(0)
+            return match.group(1) + fingerprinted_name(name, fingerprints[name]).encode()
+
+        data = ASSET_REFERENCE.sub(replace, data)
+        return data, tuple(fingerprints.items())
+
+    def _store(self, entry):
+        with self._lock:
+            old = self._entries.pop(entry.path, None)
+            if old is not None:
+                self.total_bytes -= old.nbytes
+            self._entries[entry.path] = entry
+            self.total_bytes += entry.nbytes
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.nbytes
+
+    def warm(self, extensions=COMPRESSIBLE_EXTENSIONS):
+        """Load and compress every public page, stylesheet and script now"""
+        for directory, subdirs, files in os.walk(self.root):
+            subdirs[:] = [d for d in subdirs if not d.startswith('.') and d not in (
+                '__pycache__', 'Backend', 'benchmarks', page_builder.PARTIALS_DIR)]
+            for name in files:
+                if name.lower().endswith(extensions):
+                    self.get(os.path.relpath(os.path.join(directory, name), self.root))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'files': len(self._entries),
+                'bytes': self.total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'brotli': brotli is not None
+            }
+
+
+    def build(self, out_dir):
+        """Write every public file, fingerprinted copies of the assets and
+        their .gz/.br variants under out_dir"""
+        self.warm(ALLOWED_EXTENSIONS)
+        with self._lock:
+            entries = list(self._entries.values())
+
+        for entry in entries:
+            name = os.path.relpath(entry.path, self.root).replace(os.sep, '/')
+            names = [name]
+            if name in FINGERPRINTED_ASSETS:
+                names.append(fingerprinted_name(name, entry.etag[:FINGERPRINT_LENGTH]))
+            for target in names:
+                target = os.path.join(out_dir, target)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                for encoding, suffix in (('identity', ''), ('gzip', '.gz'), ('br', '.br')):
+                    if encoding in entry.variants:
+                        with open(target + suffix, 'wb') as f:
+                            f.write(entry.variants[encoding])
+                shutil.copystat(entry.path, target)
+
+        with open(os.path.join(out_dir, BUILD_MARKER), 'w') as f:
+            f.write(f'{len(entries)} files built from {self.root}\n')
+        return entries
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Precompress and fingerprint the static files')
+    parser.add_argument('--out', help='write the built tree to this directory')
+    args = parser.parse_args()
+
+    cache = StaticFileCache(os.path.dirname(os.path.abspath(__file__)))
+    if args.out:
+        cache.build(args.out)
+    else:
+        cache.warm()
+    for entry in cache._entries.values():
+        sizes = ', '.join(f'{name} {len(body)}' for name, body in entry.variants.items())
+        print(f'{os.path.relpath(entry.path, cache.root)}: {sizes}')
+    for name in FINGERPRINTED_ASSETS:
+        fingerprint = cache.fingerprint(name)
+        if fingerprint:
+            print(f'{name} -> {fingerprinted_name(name, fingerprint)}')
+    print(cache.stats())
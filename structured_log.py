@@ -0,0 +1,256 @@
+"""
+UHAI DAMU - Non-blocking structured logging
+Handlers only put a record on a bounded in-memory queue; a background
+listener thread formats it as one JSON line and writes it to stdout (and
+optionally a file). A handler never waits on I/O.
+
+    log = get_logger('app')
+    log.warning('Supabase error: %s', status, extra={'fields': {'endpoint': endpoint}})
+    log.exception('Login error: %s', e)
+
+Every line carries the current request id (see request_id_var). Repeated
+messages are sampled: each message template may log LOG_SAMPLE_BURST times
+per LOG_SAMPLE_WINDOW seconds, and the next line that gets through reports
+how many were suppressed. Full tracebacks are printed once per
+LOG_TRACEBACK_INTERVAL seconds per raising code location; in between only
+the exception type and message are kept.
+
+Environment:
+    LOG_LEVEL               INFO
+    LOG_FILE                optional path, written in addition to stdout
+    LOG_QUEUE_SIZE          10000 records; extra records are dropped and counted
+    LOG_SAMPLE_BURST        20
+    LOG_SAMPLE_WINDOW       10 seconds
+    LOG_TRACEBACK_INTERVAL  60 seconds
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import traceback
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+ROOT_LOGGER = 'uhai'
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FILE = os.environ.get('LOG_FILE')
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+LOG_SAMPLE_BURST = int(os.environ.get('LOG_SAMPLE_BURST', 20))
+LOG_SAMPLE_WINDOW = float(os.environ.get('LOG_SAMPLE_WINDOW', 10))
+LOG_TRACEBACK_INTERVAL = float(os.environ.get('LOG_TRACEBACK_INTERVAL', 60))
+
+# Set per request by the web layer; copied into fan-out threads with the context
+request_id_var = ContextVar('request_id', default='-')
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+def request_id_from(header_value):
+    """Reuse a well-formed incoming X-Request-ID, otherwise make a new one"""
+    if header_value and REQUEST_ID_PATTERN.match(header_value):
+        return header_value
+    return uuid.uuid4().hex
+
+
+class SamplingFilter(logging.Filter):
+    """Let each (logger, level, template) through `burst` times per window"""
+
+    def __init__(self, burst=LOG_SAMPLE_BURST, window=LOG_SAMPLE_WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.suppressed_total = 0
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is None or now - entry[0] >= self.window:
+                if len(self._windows) > 10000:
+                    self._windows.clear()
+                suppressed = entry[2] if entry else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if entry[1] < self.burst:
+                entry[1] += 1
+                return True
+            entry[2] += 1
+            self.suppressed_total += 1
+            return False
+
+
+class TracebackLimiter(logging.Filter):
+    """Keep a record's full traceback only once per interval per raising line"""
+
+    def __init__(self, interval=LOG_TRACEBACK_INTERVAL):
+        super().__init__()
+        self.interval = interval
+        self._last_seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not record.exc_info or not record.exc_info[1]:
+            return True
+
+        exc_type, exc, tb = record.exc_info
+        while tb is not None and tb.tb_next is not None:
+            tb = tb.tb_next
+        site = (exc_type, tb.tb_frame.f_code.co_filename, tb.tb_lineno) if tb else (exc_type,)
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_seen.get(site, -self.interval) < self.interval:
+                record.exc_summary = f'{exc_type.__name__}: {exc}'
+                record.exc_info = None
+            else:
+                self._last_seen[site] = now
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full
+    and defers all formatting to the listener thread"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Resolve the message now (args may change later) but leave the
+        # traceback for the listener to format
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        line = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'msg': record.getMessage()
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line.update(fields)
+        if getattr(record, 'suppressed', 0):
+            line['suppressed'] = record.suppressed
+        if record.exc_info:
+            line['exc'] = ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+        elif getattr(record, 'exc_summary', None):
+            line['exc'] = record.exc_summary
+        return json.dumps(line, default=str, ensure_ascii=False)
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+_state = {'pid': None, 'listener': None, 'handler': None, 'sampler': None}
+_setup_lock = threading.Lock()
+
+
+def _output_handlers():
+    formatter = JsonFormatter()
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if LOG_FILE:
+        handlers.append(logging.FileHandler(LOG_FILE, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def _start_listener():
+    """(Re)start the writer thread for this process"""
+    handler = _state['handler']
+    listener = QueueListener(handler.queue, *_output_handlers(), respect_handler_level=False)
+    listener.start()
+    _state['listener'] = listener
+    _state['pid'] = os.getpid()
+
+
+def setup_logging():
+    """Attach the queue handler to the 'uhai' logger once per process"""
+    with _setup_lock:
+        if _state['handler'] is not None:
+            if _state['pid'] != os.getpid():
+                _start_listener()
+            return logging.getLogger(ROOT_LOGGER)
+
+        handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        sampler = SamplingFilter()
+        handler.addFilter(sampler)
+        handler.addFilter(TracebackLimiter())
+        handler.addFilter(RequestIdFilter())
+        _state['handler'] = handler
+        _state['sampler'] = sampler
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(LOG_LEVEL)
+        root.addHandler(handler)
+        root.propagate = False
+        _start_listener()
+
+    atexit.register(shutdown)
+    # A forked gunicorn worker inherits the queue but not the writer thread
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_after_fork)
+    return root
+
+
+def _after_fork():
+    global _setup_lock
+    _setup_lock = threading.Lock()
+    if _state['handler'] is not None:
+        _state['handler'].queue = queue.Queue(LOG_QUEUE_SIZE)
+        _start_listener()
+
+
+def shutdown():
+    """Flush queued records (called at exit)"""
+    listener = _state['listener']
+    if listener is not None and _state['pid'] == os.getpid():
+        _state['listener'] = None
+        listener.stop()
+
+
+def get_logger(name):
+    """Logger under the 'uhai' hierarchy, e.g. get_logger('app')"""
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+def stats():
+    handler = _state['handler']
+    if handler is None:
+        return {'queued': 0, 'dropped': 0, 'suppressed': 0}
+    return {
+        'queued': handler.queue.qsize(),
+        'dropped': handler.dropped,
+        'suppressed': _state['sampler'].suppressed_total
+    }
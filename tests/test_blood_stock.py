@@ -0,0 +1,48 @@
+"""
+Public blood stock: the PostgREST query sent for a location.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import app as uhai_app
+from ttl_cache import TTLCache
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    sent = []
+
+    def supabase_request(method, endpoint, data=None, params=None):
+        sent.append(endpoint)
+        return []
+
+    monkeypatch.setattr(uhai_app, 'supabase_request', supabase_request)
+    monkeypatch.setattr(uhai_app, 'blood_stock_cache', TTLCache(ttl=60))
+    return sent
+
+
+def test_constituency_is_ignored_without_the_column(queries, monkeypatch):
+    monkeypatch.setattr(uhai_app, 'BLOOD_STOCK_BY_CONSTITUENCY', False)
+    client = uhai_app.app.test_client()
+    assert client.get('/api/blood-stock/Nairobi/Westlands').status_code == 200
+    client.get('/api/blood-stock/Nairobi/Langata')
+    client.get('/api/blood-stock/Nairobi/all')
+    assert queries == ['hospitals?select=id,hospital_name,contact_phone,address,users!inner(county),blood_stock(*)'
+                       '&users.county=eq.Nairobi']
+
+
+def test_constituency_filter_when_enabled(queries, monkeypatch):
+    monkeypatch.setattr(uhai_app, 'BLOOD_STOCK_BY_CONSTITUENCY', True)
+    client = uhai_app.app.test_client()
+    client.get('/api/blood-stock/Nairobi/Westlands')
+    client.get('/api/blood-stock/Nairobi/all')
+    assert queries[0].endswith('&users.county=eq.Nairobi&constituency=eq.Westlands')
+    assert queries[1].endswith('&users.county=eq.Nairobi')
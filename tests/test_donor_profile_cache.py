@@ -0,0 +1,110 @@
+"""
+Donor profile cache: versions shared between workers and the login race.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import app as uhai_app
+from ttl_cache import MemoryVersionStore, SQLiteVersionStore, TTLCache
+
+DONOR_ID = 'donor-1'
+
+
+def donor_row(tattoos):
+    return {
+        'id': DONOR_ID, 'email': 'donor@example.com', 'password_hash': 'x', 'full_name': 'Demo Donor',
+        'phone': '0700000000', 'user_type': 'donor',
+        'donors': [{'blood_type': 'O+', 'tattoos_last_6months': tattoos}]
+    }
+
+
+@pytest.fixture
+def donor_db(monkeypatch):
+    """A one-donor Supabase whose reads can run a hook mid-fetch"""
+    db = {'tattoos': False, 'during_fetch': None, 'fetches': 0}
+
+    def supabase_request(method, endpoint, data=None, params=None):
+        assert method == 'GET' and 'donors(*)' in endpoint
+        db['fetches'] += 1
+        row = donor_row(db['tattoos'])
+        hook, db['during_fetch'] = db['during_fetch'], None
+        if hook:
+            hook()
+        return [row]
+
+    monkeypatch.setattr(uhai_app, 'supabase_request', supabase_request)
+    monkeypatch.setattr(uhai_app, 'check_password', lambda *args, **kwargs: True)
+    monkeypatch.setattr(uhai_app, 'LOGIN_THROTTLE_ENABLED', False)
+    monkeypatch.setattr(uhai_app, 'donor_profile_cache', TTLCache(ttl=60))
+    monkeypatch.setattr(uhai_app, 'donor_profile_versions', MemoryVersionStore())
+    return db
+
+
+def update_status_elsewhere(db):
+    """What another worker's PUT /api/donor/status does"""
+    db['tattoos'] = True
+    uhai_app.donor_profile_versions.bump(DONOR_ID)
+
+
+def cached_tattoos():
+    with uhai_app.app.test_request_context():
+        return uhai_app.load_donor_profile(DONOR_ID)['donationStatus']['tattoosLast6Months']
+
+
+def login():
+    client = uhai_app.app.test_client()
+    response = client.post('/api/donor/login', json={'email': 'donor@example.com', 'password': 'secret'})
+    assert response.status_code == 200
+
+
+def test_login_caches_the_profile(donor_db):
+    login()
+    assert cached_tattoos() is False
+    assert donor_db['fetches'] == 1
+
+
+def test_update_between_login_fetch_and_cache_is_not_lost(donor_db):
+    donor_db['during_fetch'] = lambda: update_status_elsewhere(donor_db)
+    login()
+    assert cached_tattoos() is True
+    assert donor_db['fetches'] == 2
+
+
+def test_update_during_profile_read_is_not_lost(donor_db):
+    donor_db['during_fetch'] = lambda: update_status_elsewhere(donor_db)
+    assert cached_tattoos() is False
+    assert cached_tattoos() is True
+
+
+def test_update_after_caching_is_seen(donor_db):
+    login()
+    update_status_elsewhere(donor_db)
+    assert cached_tattoos() is True
+
+
+@pytest.mark.parametrize('make_store', [MemoryVersionStore, lambda: SQLiteVersionStore(':memory:')],
+                         ids=['memory', 'sqlite'])
+def test_versions_come_from_one_sequence(make_store):
+    store = make_store()
+    assert store.latest() == 0 and store.get('a') == 0
+    store.bump('a')
+    store.bump('b')
+    store.bump('a')
+    assert store.get('a') == 3 and store.get('b') == 2
+    assert store.latest() == 3
+
+
+def test_sqlite_versions_are_shared_between_connections(tmp_path):
+    path = str(tmp_path / 'versions.db')
+    writer, reader = SQLiteVersionStore(path), SQLiteVersionStore(path)
+    seen = reader.latest()
+    writer.bump(DONOR_ID)
+    assert reader.get(DONOR_ID) > seen
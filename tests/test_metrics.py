@@ -0,0 +1,59 @@
+"""
+/metrics access: closed unless a token or an allowed address is configured.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import ipaddress
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import app as uhai_app
+import metrics
+
+
+@pytest.fixture
+def scrape_settings(monkeypatch):
+    def configure(token='', allow=()):
+        monkeypatch.setattr(metrics, 'METRICS_TOKEN', token)
+        monkeypatch.setattr(metrics, 'METRICS_ALLOW', [ipaddress.ip_network(n) for n in allow])
+    configure()
+    return configure
+
+
+def scrape(headers=None, remote_addr='203.0.113.7'):
+    client = uhai_app.app.test_client()
+    return client.get('/metrics', headers=headers or {}, environ_base={'REMOTE_ADDR': remote_addr})
+
+
+def test_metrics_are_closed_by_default(scrape_settings):
+    assert scrape().status_code == 404
+    assert scrape(remote_addr='127.0.0.1').status_code == 404
+
+
+def test_token_opens_metrics(scrape_settings):
+    scrape_settings(token='s3cret')
+    assert scrape({'Authorization': 'Bearer wrong'}).status_code == 404
+    assert scrape({'Authorization': 'Bearer s3cret'}).status_code != 404
+
+
+def test_allowed_networks_open_metrics(scrape_settings):
+    scrape_settings(allow=['127.0.0.1/32', '10.0.0.0/8'])
+    assert scrape(remote_addr='10.1.2.3').status_code != 404
+    assert scrape(remote_addr='203.0.113.7').status_code == 404
+
+
+def test_forwarded_for_cannot_spoof_an_allowed_address(scrape_settings):
+    scrape_settings(allow=['10.0.0.0/8'])
+    # The proxy appends the real client address; only that one counts
+    assert scrape({'X-Forwarded-For': '10.0.0.1, 203.0.113.7'}).status_code == 404
+
+
+def test_non_ascii_authorization_is_rejected(scrape_settings):
+    scrape_settings(token='s3cret')
+    assert not metrics.scrape_allowed('203.0.113.7', 'Bearer s3crét')
@@ -0,0 +1,66 @@
+"""
+bcrypt process pool: limits and timeouts surface as PasswordPoolBusy.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import app as uhai_app
+import password_pool
+from password_pool import PasswordPool, PasswordPoolBusy
+
+
+def slow_job(seconds):
+    time.sleep(seconds)
+    return seconds, seconds
+
+
+@pytest.fixture
+def pool():
+    pool = PasswordPool(workers=1, max_pending=2)
+    yield pool
+    if pool._executor is not None:
+        pool._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def test_full_pool_raises_busy(pool):
+    pool.submit(slow_job, 0.3)
+    pool.submit(slow_job, 0.3)
+    with pytest.raises(PasswordPoolBusy):
+        pool.submit(slow_job, 0.3)
+    assert pool.stats()['rejected'] == 1
+
+
+def test_wait_timeout_raises_busy_and_frees_the_queued_slot(pool, monkeypatch):
+    monkeypatch.setattr(password_pool, 'BCRYPT_WAIT_TIMEOUT', 0.1)
+    pool.max_pending = 4
+    # The helper runs one job and the executor hands it one more; the third waits in the queue
+    ahead = [pool.submit(slow_job, 0.3) for _ in range(2)]
+    with pytest.raises(PasswordPoolBusy):
+        pool.run('verify', slow_job, 0.3)
+    assert pool.pending == 2
+    for future in ahead:
+        future.result()
+
+
+def test_login_answers_503_when_the_password_check_times_out(monkeypatch):
+    user = {'id': 'donor-1', 'email': 'donor@example.com', 'password_hash': 'x', 'full_name': 'Demo Donor',
+            'user_type': 'donor', 'donors': []}
+
+    def timed_out(*args, **kwargs):
+        raise PasswordPoolBusy('Password service timed out')
+
+    monkeypatch.setattr(uhai_app, 'LOGIN_THROTTLE_ENABLED', False)
+    monkeypatch.setattr(uhai_app, 'supabase_request', lambda *args, **kwargs: [user])
+    monkeypatch.setattr(uhai_app, 'verify_password', timed_out)
+    response = uhai_app.app.test_client().post('/api/donor/login',
+                                               json={'email': 'donor@example.com', 'password': 'secret'})
+    assert response.status_code == 503
@@ -0,0 +1,139 @@
+"""
+Token buckets (both stores) and the login throttle.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import app as uhai_app
+from rate_limit import LoginThrottle, MemoryBucketStore, SQLiteBucketStore
+
+EMAIL = 'donor@example.com'
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryBucketStore()
+    return SQLiteBucketStore(str(tmp_path / 'buckets.db'))
+
+
+# ============================================
+# BUCKET STORES
+# ============================================
+def test_bucket_allows_capacity_then_rejects(store):
+    results = [store.take('k', 3, 0.001) for _ in range(4)]
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] >= 1
+
+
+def test_bucket_refills_over_time(store):
+    assert store.take('k', 1, 20)[0]
+    assert not store.take('k', 1, 20)[0]
+    time.sleep(0.1)
+    assert store.take('k', 1, 20)[0]
+
+
+def test_refund_returns_a_token_but_never_past_capacity(store):
+    assert store.take('k', 2, 0.001)[0]
+    assert store.take('k', 2, 0.001)[0]
+    assert store.take('k', 2, 0.001, cost=-1)[0]
+    assert store.take('k', 2, 0.001)[0]
+    assert not store.take('k', 2, 0.001)[0]
+
+    for _ in range(5):
+        store.take('full', 2, 0.001, cost=-1)
+    assert [store.take('full', 2, 0.001)[0] for _ in range(3)] == [True, True, False]
+
+
+def test_buckets_are_separate_per_key(store):
+    assert store.take('a', 1, 0.001)[0]
+    assert not store.take('a', 1, 0.001)[0]
+    assert store.take('b', 1, 0.001)[0]
+
+
+def take_tokens(path, count, results):
+    store = SQLiteBucketStore(path)
+    results.put(sum(store.take('shared', 10, 0.001)[0] for _ in range(count)))
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_sqlite_buckets_are_shared_between_processes(tmp_path):
+    path = str(tmp_path / 'buckets.db')
+    SQLiteBucketStore(path)
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    workers = [context.Process(target=take_tokens, args=(path, 8, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    allowed = sum(results.get(timeout=10) for _ in workers)
+    for worker in workers:
+        worker.join(timeout=10)
+    assert allowed == 10
+
+
+# ============================================
+# LOGIN THROTTLE
+# ============================================
+def test_failed_attempts_lock_the_email(store):
+    throttle = LoginThrottle(store, ip_capacity=100, email_capacity=3, email_per_minute=0.01)
+    for _ in range(3):
+        assert throttle.check('10.0.0.1', EMAIL)[0]
+    allowed, wait, scope = throttle.check('10.0.0.2', EMAIL.upper())
+    assert (allowed, scope) == (False, 'email') and wait >= 1
+
+
+def test_successful_logins_do_not_count(store):
+    throttle = LoginThrottle(store, ip_capacity=100, email_capacity=2, email_per_minute=0.01)
+    for _ in range(10):
+        assert throttle.check('10.0.0.1', EMAIL)[0]
+        throttle.refund(EMAIL)
+
+
+def test_ip_limit_applies_across_emails(store):
+    throttle = LoginThrottle(store, ip_capacity=2, ip_per_minute=0.01)
+    assert throttle.check('10.0.0.1', 'a@example.com')[0]
+    assert throttle.check('10.0.0.1', 'b@example.com')[0]
+    assert throttle.check('10.0.0.1', 'c@example.com')[2] == 'ip'
+
+
+def test_parallel_wrong_passwords_are_limited_per_email(monkeypatch):
+    """Attempts in flight together must not all pass on the same email token"""
+    throttle = LoginThrottle(MemoryBucketStore(), ip_capacity=100, email_capacity=3, email_per_minute=0.01)
+    user = {'id': 'donor-1', 'email': EMAIL, 'password_hash': 'x', 'full_name': 'Demo Donor',
+            'user_type': 'donor', 'donors': []}
+    attempts = 8
+    barrier = threading.Barrier(attempts, timeout=5)
+
+    def slow_wrong_password(*args, **kwargs):
+        time.sleep(0.2)
+        return False
+
+    def post_login(statuses):
+        client = uhai_app.app.test_client()
+        barrier.wait()
+        response = client.post('/api/donor/login', json={'email': EMAIL, 'password': 'guess'})
+        statuses.append(response.status_code)
+
+    monkeypatch.setattr(uhai_app, 'LOGIN_THROTTLE_ENABLED', True)
+    monkeypatch.setattr(uhai_app, 'login_throttle', throttle)
+    monkeypatch.setattr(uhai_app, 'supabase_request', lambda *args, **kwargs: [user])
+    monkeypatch.setattr(uhai_app, 'check_password', slow_wrong_password)
+
+    statuses = []
+    threads = [threading.Thread(target=post_login, args=(statuses,)) for _ in range(attempts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(statuses) == [401] * 3 + [429] * 5
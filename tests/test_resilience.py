@@ -0,0 +1,280 @@
+"""
+Circuit breaker, retry policy and send_supabase() behaviour.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+import app as uhai_app
+from async_supabase import AsyncSupabaseClient
+from resilience import CircuitBreaker, IdempotencyStore, RetryPolicy
+
+
+class ScriptedAdapter(BaseAdapter):
+    """Answers each request with the next status code (or raises an exception) from `script`"""
+
+    def __init__(self, script):
+        super().__init__()
+        self.script = list(script)
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        outcome = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response._content = b'[]'
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    monkeypatch.setattr(uhai_app, 'supabase_breaker', breaker)
+    monkeypatch.setattr(uhai_app, 'supabase_retry', RetryPolicy(attempts=3, base_delay=0, max_delay=0))
+    return breaker
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    session = requests.Session()
+    monkeypatch.setattr(uhai_app, 'get_http_session', lambda: session)
+
+    def install(*script):
+        adapter = ScriptedAdapter(script)
+        session.mount(uhai_app.SUPABASE_URL, adapter)
+        return adapter
+    return install
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def wait_for_reset(breaker):
+    time.sleep(breaker.reset_timeout + 0.01)
+
+
+# ============================================
+# CIRCUIT BREAKER
+# ============================================
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    open_breaker(breaker)
+    wait_for_reset(breaker)
+    assert breaker.allow() == CircuitBreaker.TRIAL
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_trial_outcome_closes_or_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    open_breaker(breaker)
+    wait_for_reset(breaker)
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    wait_for_reset(breaker)
+    permit = breaker.allow()
+    breaker.record_success()
+    breaker.release(permit)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_release_frees_an_unsettled_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    open_breaker(breaker)
+    wait_for_reset(breaker)
+    permit = breaker.allow()
+    breaker.release(permit)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() == CircuitBreaker.TRIAL
+
+
+def test_release_of_a_closed_permit_keeps_the_trial_claimed():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    closed_permit = breaker.allow()
+    breaker.record_failure()
+    wait_for_reset(breaker)
+    assert breaker.allow() == CircuitBreaker.TRIAL
+    breaker.release(closed_permit)
+    assert not breaker.allow()
+
+
+# ============================================
+# RETRY POLICY
+# ============================================
+def test_backoff_is_capped_full_jitter():
+    policy = RetryPolicy(attempts=5, base_delay=0.1, max_delay=0.3)
+    for attempt in range(6):
+        for _ in range(50):
+            assert 0 <= policy.backoff(attempt) <= min(0.3, 0.1 * 2 ** attempt)
+
+
+# ============================================
+# IDEMPOTENCY STORE
+# ============================================
+def test_full_store_evicts_completed_entries_first():
+    store = IdempotencyStore(max_entries=2)
+    assert store.begin('running', 'f') == ('new', None)
+    assert store.begin('finished', 'f') == ('new', None)
+    store.complete('finished', 'response')
+    assert store.begin('next', 'f') == ('new', None)
+    assert store.begin('running', 'f') == ('in_progress', None)
+    assert store.begin('finished', 'f') == ('full', None)
+
+
+def test_full_store_rejects_rather_than_evicting_running_requests():
+    store = IdempotencyStore(max_entries=2)
+    store.begin('a', 'f')
+    store.begin('b', 'f')
+    assert store.begin('c', 'f') == ('full', None)
+    assert store.begin('a', 'f') == ('in_progress', None)
+    store.abandon('a')
+    assert store.begin('c', 'f') == ('new', None)
+
+
+def test_expired_running_entries_can_be_evicted():
+    store = IdempotencyStore(ttl=0.01, max_entries=1)
+    store.begin('stuck', 'f')
+    time.sleep(0.02)
+    assert store.begin('next', 'f') == ('new', None)
+
+
+def test_idempotent_endpoint_answers_503_when_store_is_full(monkeypatch):
+    store = IdempotencyStore(max_entries=1)
+    store.begin('someone else', 'f')
+    monkeypatch.setattr(uhai_app, 'idempotency_store', store)
+    response = uhai_app.app.test_client().post('/api/donor/register', json={},
+                                               headers={'Idempotency-Key': 'k1'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+# ============================================
+# SEND_SUPABASE
+# ============================================
+def test_get_is_retried_on_503(breaker, upstream):
+    adapter = upstream(503, 200)
+    response = uhai_app.send_supabase('GET', f'{uhai_app.SUPABASE_URL}/rest/v1/users')
+    assert response.status_code == 200
+    assert adapter.calls == 2
+
+
+def test_post_is_not_retried_after_a_read_error(breaker, upstream):
+    adapter = upstream(requests.ReadTimeout('lost'), 201)
+    assert uhai_app.send_supabase('POST', f'{uhai_app.SUPABASE_URL}/rest/v1/users') is None
+    assert adapter.calls == 1
+
+
+def test_post_is_resent_after_a_connect_timeout(breaker, upstream):
+    adapter = upstream(requests.ConnectTimeout('never connected'), 201)
+    response = uhai_app.send_supabase('POST', f'{uhai_app.SUPABASE_URL}/rest/v1/users')
+    assert response.status_code == 201
+    assert adapter.calls == 2
+
+
+def test_open_breaker_skips_the_call(breaker, upstream):
+    adapter = upstream(200)
+    open_breaker(breaker)
+    assert uhai_app.send_supabase('GET', f'{uhai_app.SUPABASE_URL}/rest/v1/users') is None
+    assert adapter.calls == 0
+
+
+def test_spent_budget_does_not_hold_the_trial_slot(breaker, upstream):
+    adapter = upstream(200)
+    open_breaker(breaker)
+    wait_for_reset(breaker)
+
+    with uhai_app.app.test_request_context():
+        uhai_app.g.upstream_deadline = time.monotonic() - 1
+        assert uhai_app.send_supabase('GET', f'{uhai_app.SUPABASE_URL}/rest/v1/users') is None
+
+    response = uhai_app.send_supabase('GET', f'{uhai_app.SUPABASE_URL}/rest/v1/users')
+    assert response.status_code == 200
+    assert adapter.calls == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unexpected_error_releases_the_trial_slot(breaker, upstream):
+    upstream(ValueError('bad adapter'), 200)
+    open_breaker(breaker)
+    wait_for_reset(breaker)
+
+    with pytest.raises(ValueError):
+        uhai_app.send_supabase('GET', f'{uhai_app.SUPABASE_URL}/rest/v1/users')
+    response = uhai_app.send_supabase('GET', f'{uhai_app.SUPABASE_URL}/rest/v1/users')
+    assert response.status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+# ============================================
+# ASYNC CLIENT
+# ============================================
+def test_cancelled_async_call_releases_the_trial_slot():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+
+    async def handler(request):
+        if request.url.path.endswith('/slow'):
+            await asyncio.sleep(10)
+        return httpx.Response(200, json=[])
+
+    async def run():
+        client = AsyncSupabaseClient('http://supabase.test', 'key', breaker=breaker,
+                                     transport=httpx.MockTransport(handler))
+        open_breaker(breaker)
+        wait_for_reset(breaker)
+        task = asyncio.ensure_future(client.request('GET', 'slow'))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        result = await client.request('GET', 'fast')
+        await client.close()
+        return result
+
+    assert asyncio.run(run()) == []
+    assert breaker.state == CircuitBreaker.CLOSED
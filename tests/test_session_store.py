@@ -0,0 +1,139 @@
+"""
+Server-side sessions: stores and session-id rotation on login.
+
+Run from the project root:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from flask import Flask, jsonify, session
+
+from session_store import MemorySessionStore, ServerSessionInterface, SQLiteSessionStore
+
+COOKIE = 'session'
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemorySessionStore()
+    return SQLiteSessionStore(str(tmp_path / 'sessions.db'))
+
+
+@pytest.fixture
+def client(store):
+    app = Flask(__name__)
+    app.session_interface = ServerSessionInterface(store)
+
+    @app.route('/visit')
+    def visit():
+        session['visits'] = session.get('visits', 0) + 1
+        return jsonify(session.get('visits'))
+
+    @app.route('/login/<user_id>')
+    def login(user_id):
+        session['user_id'] = user_id
+        return jsonify(True)
+
+    @app.route('/logout')
+    def logout():
+        session.clear()
+        return jsonify(True)
+
+    @app.route('/whoami')
+    def whoami():
+        return jsonify(session.get('user_id'))
+
+    return app.test_client()
+
+
+def session_id(client):
+    cookie = client.get_cookie(COOKIE)
+    return cookie.value if cookie else None
+
+
+# ============================================
+# STORES
+# ============================================
+def test_store_round_trip_and_delete(store):
+    store.set('sid', {'user_id': 'u1'}, ttl=60)
+    assert store.get('sid') == {'user_id': 'u1'}
+    store.delete('sid')
+    assert store.get('sid') is None
+
+
+def test_expired_sessions_are_not_returned(store):
+    store.set('sid', {'user_id': 'u1'}, ttl=0.05)
+    time.sleep(0.1)
+    assert store.get('sid') is None
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(max_entries=2)
+    store.set('a', {}, ttl=60)
+    store.set('b', {}, ttl=60)
+    store.get('a')
+    store.set('c', {}, ttl=60)
+    assert store.get('a') == {} and store.get('b') is None
+
+
+def test_sqlite_sessions_are_shared_between_connections(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    SQLiteSessionStore(path).set('sid', {'user_id': 'u1'}, ttl=60)
+    assert SQLiteSessionStore(path).get('sid') == {'user_id': 'u1'}
+
+
+# ============================================
+# SESSION INTERFACE
+# ============================================
+def test_login_issues_a_new_session_id(client, store):
+    client.get('/visit')
+    before_login = session_id(client)
+    assert before_login
+
+    client.get('/login/u1')
+    after_login = session_id(client)
+    assert after_login != before_login
+    assert store.get(before_login) is None
+    assert store.get(after_login) == {'visits': 1, 'user_id': 'u1'}
+
+
+def test_planted_session_id_is_useless_after_login(client):
+    client.get('/visit')
+    planted = session_id(client)
+    client.get('/login/u1')
+
+    attacker = client.application.test_client()
+    attacker.set_cookie(COOKIE, planted)
+    assert attacker.get('/whoami').get_json() is None
+
+
+def test_switching_user_rotates_again(client):
+    client.get('/login/u1')
+    first = session_id(client)
+    client.get('/login/u2')
+    assert session_id(client) != first
+    assert client.get('/whoami').get_json() == 'u2'
+
+
+def test_same_user_keeps_the_session_id(client):
+    client.get('/login/u1')
+    sid = session_id(client)
+    client.get('/visit')
+    client.get('/visit')
+    assert session_id(client) == sid
+    assert client.get('/visit').get_json() == 3
+
+
+def test_logout_deletes_the_stored_session(client, store):
+    client.get('/login/u1')
+    sid = session_id(client)
+    client.get('/logout')
+    assert store.get(sid) is None
+    assert session_id(client) is None
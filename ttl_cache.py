@@ -0,0 +1,140 @@
+"""
+UHAI DAMU - In-process TTL cache
+Small thread-safe LRU cache with per-entry expiry, shared by the response caches.
+
+Version stores carry invalidations across processes: a writer bumps a
+key's version and readers drop cached values stored under an older one.
+Versions come from one store-wide sequence, so latest() read before a
+fetch tells whether any key was bumped while the fetch was running, even
+when the key is only known from the fetched row (e.g. login by email).
+    MemoryVersionStore  per-process; for a single worker
+    SQLiteVersionStore  SQLite file shared by every worker on the host
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire `ttl` seconds after being set.
+
+    `generation` is bumped by clear()/invalidate(). Readers that start a slow
+    upstream fetch can pass the generation they saw to set(); if a write
+    invalidated the cache in the meantime the stale value is not stored.
+    """
+
+    def __init__(self, ttl=60, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None, generation=None):
+        """Store value for key; skipped if the cache was invalidated since `generation`"""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, key):
+        """Remove a single key"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self.generation += 1
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self):
+        """Hit/miss counters for this cache"""
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class MemoryVersionStore:
+    """Per-key version counters in this process"""
+
+    def __init__(self):
+        self._versions = {}
+        self._latest = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def latest(self):
+        with self._lock:
+            return self._latest
+
+    def bump(self, key):
+        with self._lock:
+            self._latest += 1
+            self._versions[key] = self._latest
+
+
+class SQLiteVersionStore:
+    """Per-key version counters in a SQLite file (primary-key lookups, WAL mode)"""
+
+    def __init__(self, path, busy_timeout=2.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS cache_versions (key TEXT PRIMARY KEY, version INTEGER)')
+            db.execute('CREATE INDEX IF NOT EXISTS cache_versions_version ON cache_versions (version)')
+
+    def _connect(self):
+        db = getattr(self._local, 'db', None)
+        if db is None or getattr(self._local, 'pid', None) != os.getpid():
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def get(self, key):
+        row = self._connect().execute('SELECT version FROM cache_versions WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else 0
+
+    def latest(self):
+        row = self._connect().execute('SELECT MAX(version) FROM cache_versions').fetchone()
+        return row[0] or 0
+
+    def bump(self, key):
+        # One statement, so concurrent writers never hand out the same version
+        self._connect().execute(
+            'INSERT INTO cache_versions (key, version) '
+            'VALUES (?, (SELECT COALESCE(MAX(version), 0) + 1 FROM cache_versions)) '
+            'ON CONFLICT(key) DO UPDATE SET version = excluded.version', (key,)
+        )
@@ -0,0 +1,55 @@
+"""
+UHAI DAMU - Per-route upstream accounting
+Aggregates how many Supabase calls, milliseconds and bytes each Flask
+endpoint spends, so N+1 routes stand out.
+"""
+
+import threading
+
+
+class UpstreamStats:
+    """In-memory totals per endpoint (one instance per worker process)"""
+
+    def __init__(self):
+        self.routes = {}
+        self._lock = threading.Lock()
+
+    def record_request(self, endpoint, calls, duration_ms, size):
+        """Add one finished request that made `calls` upstream calls"""
+        with self._lock:
+            route = self.routes.setdefault(endpoint or 'unknown', {
+                'requests': 0, 'upstream_calls': 0, 'upstream_ms': 0.0, 'upstream_bytes': 0, 'max_calls': 0
+            })
+            route['requests'] += 1
+            route['upstream_calls'] += calls
+            route['upstream_ms'] += duration_ms
+            route['upstream_bytes'] += size
+            route['max_calls'] = max(route['max_calls'], calls)
+
+    def snapshot(self):
+        """Per-endpoint totals and averages, most upstream calls per request first"""
+        with self._lock:
+            rows = []
+            for endpoint, route in self.routes.items():
+                requests = route['requests'] or 1
+                rows.append(dict(
+                    route,
+                    endpoint=endpoint,
+                    upstream_ms=round(route['upstream_ms'], 1),
+                    calls_per_request=round(route['upstream_calls'] / requests, 2),
+                    ms_per_request=round(route['upstream_ms'] / requests, 1),
+                    bytes_per_request=round(route['upstream_bytes'] / requests)
+                ))
+        return sorted(rows, key=lambda row: row['calls_per_request'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self.routes = {}
+
+
+def server_timing(calls, duration_ms, size, total_ms=None):
+    """Server-Timing header value for one request's upstream usage"""
+    value = f'supabase;desc="{calls} calls, {size} bytes";dur={duration_ms:.1f}'
+    if total_ms is not None:
+        value += f', app;dur={total_ms:.1f}'
+    return value